@@ -24,11 +24,21 @@ Author: Rafael Muller
 import os
 import sys
 import json
+import re
 import subprocess
 import time
 import argparse
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Any, Union
+import asyncio
+import atexit
+import base64
+import copy
+import functools
+import importlib.util
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Any, Union, overload
 
 try:
     import colorama
@@ -36,6 +46,9 @@ try:
     colorama.init()
 except ImportError:
     print("For best experience, install colorama: pip install colorama")
+    if os.name == 'nt':
+        # Side effect: enables ANSI escape processing in the Windows 10+ console
+        os.system("")
     # Fallback if colorama is not installed
     class ForeStub:
         def __init__(self):
@@ -59,16 +72,106 @@ except ImportError:
     Style = StyleStub()
 
 
+# rich is only imported when a table or panel is first drawn, to keep startup fast
+USE_RICH = importlib.util.find_spec("rich") is not None
+if not USE_RICH:
+    print("For best experience, install rich: pip install rich")
+
 try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich.live import Live
-    from rich.panel import Panel
-    USE_RICH = True
-    console = Console()
+    # Optional: talk to the Compute Engine API directly instead of spawning gcloud
+    from google.cloud import compute_v1
+    USE_COMPUTE_SDK = True
 except ImportError:
-    USE_RICH = False
-    print("For best experience, install rich: pip install rich")
+    USE_COMPUTE_SDK = False
+
+try:
+    # Optional: query Cloud Run in-process instead of spawning gcloud
+    from google.cloud import run_v2
+    USE_RUN_SDK = True
+except ImportError:
+    USE_RUN_SDK = False
+
+try:
+    # Optional: read Cloud Run logs in-process instead of spawning gcloud
+    from google.cloud import logging_v2
+    USE_LOGGING_SDK = True
+except ImportError:
+    USE_LOGGING_SDK = False
+
+try:
+    # Optional: call the Compute Engine REST API over a pooled HTTP session
+    import requests
+    USE_REQUESTS = True
+except ImportError:
+    USE_REQUESTS = False
+
+try:
+    # Optional: faster parsing of gcloud JSON output and the config file
+    import orjson
+    USE_ORJSON = True
+except ImportError:
+    USE_ORJSON = False
+
+try:
+    # Optional: incremental JSON parsing of long gcloud listings
+    import ijson
+    USE_IJSON = True
+except ImportError:
+    USE_IJSON = False
+
+try:
+    # Optional: lets bulk VM actions share a single batch HTTP request
+    from googleapiclient import discovery
+    USE_BATCH_API = True
+except ImportError:
+    USE_BATCH_API = False
+
+def init_colors() -> None:
+    """Set the color shorthands and prebuilt messages from the current Fore codes.
+    
+    Called at import and again when --no-color swaps Fore for a stub.
+    """
+    global RED, GREEN, YELLOW, CYAN, BLUE, RESET, _MSG_INVALID, _MSG_NUMBER, _SEVERITY_COLORS
+    RED, GREEN, YELLOW, CYAN, BLUE, RESET = (
+        Fore.RED, Fore.GREEN, Fore.YELLOW, Fore.CYAN, Fore.BLUE, Fore.RESET)
+    _MSG_INVALID = f"{RED}Invalid choice. Please try again.{RESET}"
+    _MSG_NUMBER = f"{RED}Please enter a number.{RESET}"
+    # Log severity -> color, used for every Cloud Run log entry
+    _SEVERITY_COLORS = {
+        "ERROR": Fore.RED,
+        "WARNING": Fore.YELLOW,
+        "INFO": Fore.GREEN,
+        "DEBUG": Fore.BLUE
+    }
+
+
+init_colors()
+
+
+_console = None
+
+
+def get_console():
+    """Get the shared rich Console, importing rich on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_pretty(data: Any) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when it is installed."""
+    if USE_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 # Configuration file path
 import os
@@ -76,137 +179,803 @@ import os
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(SCRIPT_DIR, "config.json")
 
+# ANSI sequence that clears the terminal and moves the cursor home
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Header text with colors baked in, built on first use (and rebuilt after --no-color)
+_header_template = None
+
+# How long (in seconds) a VM status fetched from gcloud is considered fresh
+STATUS_CACHE_TTL = 15
+
+# In-memory VM status cache: (project, zone, vm_name) -> (status, fetched_at); VM names
+# are only unique within a zone
+_status_cache: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+
+# When each project's VMs were last listed (and their statuses cached): project -> listed_at
+_status_listed_at: Dict[str, float] = {}
+
+# How long (in seconds) a project's VM list is reused when returning to the VM table
+VM_LIST_CACHE_TTL = 30
+
+# In-memory VM list cache: project -> (vms, fetched_at)
+_vm_list_cache: Dict[str, Tuple[List[Dict[str, Any]], float]] = {}
+
+# Upper bound on gcloud processes running at the same time, to stay under API quotas
+MAX_CONCURRENT_GCLOUD = 8
+_gcloud_slots = threading.Semaphore(MAX_CONCURRENT_GCLOUD)
+
+# Guards the lazy creation of the credentials, API clients and Compute session below;
+# get_all_vm_statuses_multi asks for them from many threads at once on first use
+_client_lock = threading.RLock()
+
+# Application Default Credentials and project, looked up once and shared by all API clients.
+# A failed lookup is remembered too, so without an application-default login every SDK path
+# goes straight to gcloud instead of probing for credentials again
+_credentials = None
+_default_project = None
+_credentials_error: Optional[str] = None
+
+# Compute Engine clients, created on first use so startup doesn't pay for auth
+_instances_client = None
+_compute_service = None
+
+# Cloud Run and Cloud Logging clients, created on first use
+_run_services_client = None
+_run_revisions_client = None
+_logging_client = None
+
+# How long (in seconds) Cloud Run service details and revisions are reused
+CLOUD_RUN_CACHE_TTL = 30
+
+# Commands sent together by the debug container's diagnostic snapshot
+DIAGNOSTIC_COMMANDS = [
+    "env",
+    "ls -la",
+    "ps aux",
+    "netstat -tuln || ss -tuln",
+    "free -h || cat /proc/meminfo",
+    "df -h",
+]
+
+# Pooled HTTP session for requests to the debug container endpoints
+_debug_http_session = None
+
+# Identity tokens by audience, as (token, expiry epoch); reused until shortly before they expire
+_identity_tokens: Dict[str, Tuple[str, float]] = {}
+IDENTITY_TOKEN_MARGIN = 60
+
+# Number of log entries shown for a Cloud Run service, and how many are fetched per page
+CLOUD_RUN_LOG_LIMIT = 100
+CLOUD_RUN_LOG_PAGE_SIZE = 25
+
+# Friendly names for GCP region families
+REGION_DISPLAY_NAMES = {
+    "us-central": "US Central",
+    "us-west": "US West",
+    "us-east": "US East",
+    "europe": "Europe",
+    "asia": "Asia",
+}
+_REGION_RE = re.compile("|".join(REGION_DISPLAY_NAMES))
+
+# Leading arguments of every gcloud command that works on Compute Engine instances
+_GCLOUD_INSTANCE_PREFIX = ("gcloud", "compute", "instances")
+
+# Compute Engine REST endpoint, used with a cached gcloud access token
+COMPUTE_API_URL = "https://compute.googleapis.com/compute/v1"
+_compute_session = None
+
+# Maximum number of calls the Compute Engine API accepts in one batch request
+BATCH_REQUEST_LIMIT = 1000
+
+# Maximum number of VM operations a bulk action runs at the same time without the batch API
+BULK_CONCURRENCY = 10
+
+# Seconds to wait before writing pending config changes to disk
+CONFIG_FLUSH_DELAY = 5
+
+# In-memory copy of the config file. save_config only updates this copy and marks it
+# dirty; flush_config writes it out later (on a timer and at exit). "pending" is a deep
+# copy taken by save_config, so the timer thread never serializes a dict that callers
+# are still changing.
+_cfg: Dict[str, Any] = {"path": None, "data": None, "pending": None, "mtime": None,
+                        "dirty": False, "timer": None}
+_cfg_lock = threading.RLock()
+# (config path, project names) of the last get_project_list call; dropped whenever the config is
+# replaced, i.e. on save_config and when load_config reads the file again
+_project_list_cache: Optional[Tuple[str, List[str]]] = None
+
+
+def _config_mtime(config_path: str) -> Optional[float]:
+    """Get the modification time of the config file, or None if it doesn't exist."""
+    try:
+        return os.stat(config_path).st_mtime
+    except OSError:
+        return None
+
+
+def _write_config_file(config_path: str, config: Dict[str, Any]) -> None:
+    """Atomically write the configuration, so a crash never leaves a truncated file."""
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(dir=config_dir, prefix=".config-", suffix=".json")
+    try:
+        # Write the encoded bytes in one go instead of decoding them for a text-mode file
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json_dumps_pretty(config))
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def flush_config() -> None:
+    """Write pending configuration changes to disk."""
+    with _cfg_lock:
+        if _cfg["timer"] is not None:
+            _cfg["timer"].cancel()
+            _cfg["timer"] = None
+        if not _cfg["dirty"]:
+            return
+        
+        try:
+            _write_config_file(_cfg["path"], _cfg["pending"])
+            _cfg["mtime"] = _config_mtime(_cfg["path"])
+            _cfg.update(pending=None, dirty=False)
+        except Exception as e:
+            print(f"{Fore.RED}Error saving config file: {str(e)}{Fore.RESET}")
+
+
+atexit.register(flush_config)
+
+
 def load_config(config_file: str = None) -> Dict[str, Any]:
     """Load configuration from config.json file."""
+    global _project_list_cache
     # Use the specified config file or the default
     config_path = config_file or CONFIG_FILE
     
-    if not os.path.exists(config_path):
-        # Create default config if it doesn't exist
-        default_config = {
-            "projects": {}
-        }
-        with open(config_path, 'w') as f:
-            json.dump(default_config, f, indent=4)
-        return default_config
-    
-    try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"{Fore.RED}Error loading config file: {str(e)}{Fore.RESET}")
-        return {"projects": {}}
+    with _cfg_lock:
+        if _cfg["path"] == config_path and _cfg["data"] is not None:
+            # Unsaved changes win; otherwise reuse the cached copy until the file changes
+            if _cfg["dirty"] or _config_mtime(config_path) == _cfg["mtime"]:
+                return _cfg["data"]
+        elif _cfg["dirty"]:
+            flush_config()
+        
+        _project_list_cache = None
+        if not os.path.exists(config_path):
+            # Create default config if it doesn't exist
+            default_config = {
+                "projects": {}
+            }
+            try:
+                _write_config_file(config_path, default_config)
+            except Exception as e:
+                print(f"{Fore.RED}Error saving config file: {str(e)}{Fore.RESET}")
+            _cfg.update(path=config_path, data=default_config,
+                        mtime=_config_mtime(config_path), dirty=False)
+            return default_config
+        
+        try:
+            mtime = _config_mtime(config_path)
+            with open(config_path, 'rb') as f:
+                config = json_loads(f.read())
+        except Exception as e:
+            print(f"{Fore.RED}Error loading config file: {str(e)}{Fore.RESET}")
+            return {"projects": {}}
+        
+        _cfg.update(path=config_path, data=config, mtime=mtime, dirty=False)
+        return config
+
 
 def save_config(config: Dict[str, Any], config_file: str = None) -> None:
-    """Save configuration to config.json file."""
+    """Save configuration to config.json file.
+    
+    The write is deferred by CONFIG_FLUSH_DELAY seconds; call flush_config to write immediately.
+    """
+    global _project_list_cache
     # Use the specified config file or the default
     config_path = config_file or CONFIG_FILE
     
+    with _cfg_lock:
+        _project_list_cache = None
+        if _cfg["dirty"] and _cfg["path"] != config_path:
+            flush_config()
+        
+        _cfg.update(path=config_path, data=config, pending=copy.deepcopy(config), dirty=True)
+        if _cfg["timer"] is None:
+            timer = threading.Timer(CONFIG_FLUSH_DELAY, flush_config)
+            timer.daemon = True
+            _cfg["timer"] = timer
+            timer.start()
+
+
+def get_project_list(config_file: str = None) -> List[str]:
+    """Get a list of all projects from the configuration.
+    
+    The list is kept until the config is saved or read again, since the menus ask for it on every redraw;
+    callers get a copy, so changing it doesn't change the cache.
+    """
+    global _project_list_cache
+    config_path = config_file or CONFIG_FILE
+    
+    with _cfg_lock:
+        if _project_list_cache is not None and _project_list_cache[0] == config_path:
+            return list(_project_list_cache[1])
+        config = load_config(config_file)
+        projects = list(config.get("projects", {}).keys())
+        _project_list_cache = (config_path, projects)
+        return list(projects)
+
+def run_command(command: List[str], capture_output: bool = True,
+                binary: bool = False) -> Tuple[int, Union[str, bytes], str]:
+    """Run a command and return exit code, stdout, and stderr.
+    
+    With binary=True stdout is returned as undecoded bytes, which json_loads can parse
+    directly; use it for large JSON output that is only parsed.
+    """
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        with _gcloud_slots:
+            if binary:
+                result = subprocess.run(command, capture_output=capture_output, check=False)
+                stderr = result.stderr.decode("utf-8", errors="replace") if result.stderr else ""
+                return result.returncode, result.stdout or b"", stderr
+            result = subprocess.run(
+                command,
+                capture_output=capture_output,
+                text=True,
+                check=False
+            )
+        return result.returncode, result.stdout or "", result.stderr or ""
     except Exception as e:
-        print(f"{Fore.RED}Error saving config file: {str(e)}{Fore.RESET}")
+        return 1, b"" if binary else "", str(e)
+
+
+def _iter_json_array(stream) -> Iterator[Any]:
+    """Yield the elements of a JSON array read from a binary stream.
+    
+    With ijson installed elements are yielded as soon as they are parsed;
+    otherwise the whole stream is read and decoded at once.
+    """
+    if USE_IJSON:
+        yield from ijson.items(stream, "item")
+    else:
+        yield from json_loads(stream.read() or b"[]")
+
+
+def stream_command_json(command: List[str], on_item: Callable[[Any], None]) -> Tuple[int, str, Optional[Exception]]:
+    """Run a command that prints a JSON array, calling on_item for each element as it arrives.
+    
+    Returns the exit code, stderr, and the exception raised while handling the output (or None).
+    """
+    try:
+        # stderr goes to a temporary file rather than a pipe; a pipe nobody reads until stdout
+        # ends would block the command once it fills up with warnings
+        with _gcloud_slots, tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+            parse_error = None
+            try:
+                for item in _iter_json_array(proc.stdout):
+                    on_item(item)
+            except Exception as e:
+                parse_error = e
+            finally:
+                proc.stdout.close()
+            code = proc.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+        return code, stderr, parse_error
+    except Exception as e:
+        return 1, str(e), None
+
+
+def run_parallel(calls: List[Callable[[], Any]]) -> List[Any]:
+    """Run independent calls (e.g. gcloud lookups) in threads and return their results in order."""
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+
+def get_credentials():
+    """Get the shared Application Default Credentials, looking them up on first use.
+    
+    Raises RuntimeError, also on later calls, if the lookup failed.
+    """
+    global _credentials, _default_project, _credentials_error
+    if _credentials is None:
+        with _client_lock:
+            if _credentials_error is not None:
+                raise RuntimeError(f"Application Default Credentials unavailable: {_credentials_error}")
+            if _credentials is None:
+                try:
+                    import google.auth
+                    credentials, _default_project = google.auth.default(
+                        scopes=["https://www.googleapis.com/auth/cloud-platform"])
+                except Exception as e:
+                    _credentials_error = str(e)
+                    raise RuntimeError(f"Application Default Credentials unavailable: {_credentials_error}")
+                _credentials = credentials
+    return _credentials
+
+
+def get_instances_client():
+    """Get the shared Compute Engine InstancesClient, creating it on first use."""
+    global _instances_client
+    if _instances_client is None:
+        with _client_lock:
+            if _instances_client is None:
+                _instances_client = compute_v1.InstancesClient(credentials=get_credentials())
+    return _instances_client
+
+
+def run_instance_action(project: str, vm_name: str, zone: str, action: str) -> Tuple[int, str, str]:
+    """Run a start/stop/reset action on a VM and return exit code, stdout, and stderr.
+    
+    Uses the Compute Engine SDK when it is installed and falls back to gcloud otherwise.
+    gcloud's output isn't captured but shown as it runs, so stdout and stderr are empty then.
+    """
+    if USE_COMPUTE_SDK:
+        operation = None
+        try:
+            operation = getattr(get_instances_client(), action)(
+                project=project, zone=zone, instance=vm_name)
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Compute SDK {action} failed, falling back to gcloud: {str(e)}{Fore.RESET}")
+        
+        if operation is not None:
+            # The action was accepted; running it again with gcloud could e.g. reset the VM twice
+            try:
+                operation.result()
+            except Exception as e:
+                return 1, "", str(e)
+            return 0, "", ""
+    
+    cmd = [*_GCLOUD_INSTANCE_PREFIX, action, vm_name,
+           "--project", project, "--zone", zone]
+    return run_command(cmd, capture_output=False)
+
+
+def get_compute_service():
+    """Get the shared Compute Engine discovery service, creating it on first use."""
+    global _compute_service
+    if _compute_service is None:
+        with _client_lock:
+            if _compute_service is None:
+                _compute_service = discovery.build("compute", "v1", credentials=get_credentials(),
+                                                   cache_discovery=False)
+    return _compute_service
+
+
+def _operation_error(operation: Dict[str, Any]) -> Optional[str]:
+    """Get the error message of a finished Compute Engine operation, or None if it succeeded."""
+    errors = operation.get("error", {}).get("errors", [])
+    if not errors:
+        return None
+    return "; ".join(error.get("message", error.get("code", "")) for error in errors)
+
+
+def _wait_batch_operations(service, project: str, operations: Dict[Tuple[str, str], str],
+                           results: Dict[Tuple[str, str], Optional[str]]) -> None:
+    """Wait for zone operations with batched zoneOperations.wait calls and record their outcome.
+    
+    operations maps (vm_name, zone) to an operation name; each VM's error (or None) goes into results.
+    """
+    pending = dict(operations)
+    
+    def on_wait(request_id, response, exception):
+        zone, vm_name = request_id.split("/", 1)
+        if exception:
+            results[(vm_name, zone)] = str(exception)
+            pending.pop((vm_name, zone), None)
+        elif response.get("status") == "DONE":
+            results[(vm_name, zone)] = _operation_error(response)
+            pending.pop((vm_name, zone), None)
+    
+    # wait returns after at most two minutes, so ask again until every operation is done
+    while pending:
+        keys = list(pending)
+        try:
+            for offset in range(0, len(keys), BATCH_REQUEST_LIMIT):
+                batch = service.new_batch_http_request(callback=on_wait)
+                for vm_name, zone in keys[offset:offset + BATCH_REQUEST_LIMIT]:
+                    batch.add(service.zoneOperations().wait(
+                        project=project, zone=zone, operation=pending[(vm_name, zone)]),
+                        request_id=f"{zone}/{vm_name}")
+                batch.execute()
+        except Exception as e:
+            for key in pending:
+                results[key] = f"Waiting for the operation failed: {str(e)}"
+            return
+
+
+def bulk_vm_action(project: str, vms: List[Dict[str, Any]], action: str) -> Dict[Tuple[str, str], Optional[str]]:
+    """Run a start/stop/reset action on several VMs and wait for it to finish.
+    
+    Returns a dict mapping (vm_name, zone) to an error message, or None on success.
+    With google-api-python-client installed the calls are sent as batch HTTP requests
+    of up to BATCH_REQUEST_LIMIT calls each; otherwise gcloud runs them concurrently.
+    Only VMs whose batch was never sent fall back to gcloud, so no action is sent twice.
+    """
+    results: Dict[Tuple[str, str], Optional[str]] = {}
+    
+    service = None
+    if USE_BATCH_API:
+        try:
+            service = get_compute_service()
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Batch {action} unavailable, falling back to per-VM calls: {str(e)}{Fore.RESET}")
+    
+    if service is not None:
+        operations: Dict[Tuple[str, str], str] = {}
+        
+        def on_done(request_id, response, exception):
+            zone, vm_name = request_id.split("/", 1)
+            if exception:
+                results[(vm_name, zone)] = str(exception)
+            else:
+                operations[(vm_name, zone)] = response["name"]
+        
+        for offset in range(0, len(vms), BATCH_REQUEST_LIMIT):
+            chunk = vms[offset:offset + BATCH_REQUEST_LIMIT]
+            try:
+                batch = service.new_batch_http_request(callback=on_done)
+                for vm in chunk:
+                    request = getattr(service.instances(), action)(
+                        project=project, zone=vm["zone"], instance=vm["name"])
+                    batch.add(request, request_id=f"{vm['zone']}/{vm['name']}")
+            except Exception as e:
+                # Nothing of this chunk was sent, so it and the rest can go through gcloud
+                if "debug" in sys.argv:
+                    print(f"{Fore.BLUE}[DEBUG] Batch {action} failed, falling back to per-VM calls: {str(e)}{Fore.RESET}")
+                break
+            try:
+                batch.execute()
+            except Exception as e:
+                # The server may have received the batch anyway, so don't send these actions again
+                for vm in chunk:
+                    key = (vm["name"], vm["zone"])
+                    if key not in results and key not in operations:
+                        results[key] = f"The {action} request failed: {str(e)}"
+                break
+        
+        _wait_batch_operations(service, project, operations, results)
+    
+    # Handle the VMs whose batch was never sent, running the gcloud operations concurrently
+    remaining = [vm for vm in vms if (vm["name"], vm["zone"]) not in results]
+    if remaining:
+        results.update(asyncio.run(_bulk_instance_action(project, remaining, action)))
+    
+    return results
 
-def get_project_list(config_file: str = None) -> List[str]:
-    """Get a list of all projects from the configuration."""
-    config = load_config(config_file)
-    return list(config.get("projects", {}).keys())
 
-def run_command(command: List[str], capture_output: bool = True) -> Tuple[int, str, str]:
-    """Run a command and return exit code, stdout, and stderr."""
+async def _run_command_async(command: List[str]) -> Tuple[int, str, str]:
+    """Run a command without blocking the event loop and return exit code, stdout, and stderr."""
     try:
-        result = subprocess.run(
-            command,
-            capture_output=capture_output,
-            text=True,
-            check=False
-        )
-        return result.returncode, result.stdout, result.stderr
+        proc = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await proc.communicate()
+        return (proc.returncode,
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"))
     except Exception as e:
         return 1, "", str(e)
 
 
+async def _async_instance_action(project: str, vm_name: str, zone: str, action: str,
+                                 slots: asyncio.Semaphore) -> Optional[str]:
+    """Run a start/stop/reset action with gcloud --async and wait for its operation.
+    
+    Returns an error message, or None on success.
+    """
+    async with slots:
+        code, stdout, stderr = await _run_command_async(
+            [*_GCLOUD_INSTANCE_PREFIX, action, vm_name,
+             "--project", project, "--zone", zone,
+             "--async", "--format", "value(name)"])
+        if code != 0:
+            return stderr.strip() or f"{action} failed"
+        
+        operation = stdout.strip().splitlines()[-1] if stdout.strip() else ""
+        if not operation:
+            return None
+        
+        code, stdout, stderr = await _run_command_async(
+            ["gcloud", "compute", "operations", "wait", operation,
+             "--project", project, "--zone", zone])
+        return None if code == 0 else (stderr.strip() or f"{action} failed")
+
+
+async def _bulk_instance_action(project: str, vms: List[Dict[str, Any]],
+                                action: str) -> Dict[Tuple[str, str], Optional[str]]:
+    """Run an action on several VMs concurrently, at most BULK_CONCURRENCY at a time."""
+    slots = asyncio.Semaphore(BULK_CONCURRENCY)
+    errors = await asyncio.gather(*[
+        _async_instance_action(project, vm["name"], vm["zone"], action, slots) for vm in vms
+    ])
+    return {(vm["name"], vm["zone"]): error for vm, error in zip(vms, errors)}
+
+
+def _list_instances_sdk(project: str) -> List[Dict[str, Any]]:
+    """List all instances in a project with one aggregated Compute Engine API call.
+    
+    Returns dicts shaped like the gcloud JSON output (name, status, zone).
+    """
+    instances = []
+    for _, scoped_list in get_instances_client().aggregated_list(project=project):
+        for instance in scoped_list.instances:
+            instances.append({
+                "name": instance.name,
+                "status": instance.status,
+                "zone": instance.zone
+            })
+    return instances
+
+
+def _fetch_access_token() -> str:
+    """Get an OAuth access token for the active gcloud account."""
+    code, stdout, stderr = run_command(["gcloud", "auth", "print-access-token"])
+    if code != 0 or not stdout.strip():
+        raise RuntimeError(stderr.strip() or "gcloud did not return an access token")
+    return stdout.strip()
+
+
+def compute_api_get(path: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """GET a Compute Engine REST resource, e.g. "projects/p/aggregated/instances".
+    
+    The HTTP session and access token are created once and reused; the token is
+    refreshed once if the API rejects it.
+    """
+    global _compute_session
+    if _compute_session is None:
+        with _client_lock:
+            if _compute_session is None:
+                session = requests.Session()
+                session.headers["Authorization"] = f"Bearer {_fetch_access_token()}"
+                _compute_session = session
+    
+    url = f"{COMPUTE_API_URL}/{path}"
+    authorization = _compute_session.headers["Authorization"]
+    response = _compute_session.get(url, params=params, timeout=30)
+    if response.status_code == 401:
+        with _client_lock:
+            # Another thread may already have refreshed the rejected token
+            if _compute_session.headers["Authorization"] == authorization:
+                _compute_session.headers["Authorization"] = f"Bearer {_fetch_access_token()}"
+        response = _compute_session.get(url, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def _list_instances_rest(project: str) -> List[Dict[str, Any]]:
+    """List all instances in a project with the aggregated Compute Engine REST call."""
+    instances = []
+    params = {"fields": "items/*/instances(name,status,zone),nextPageToken"}
+    while True:
+        data = compute_api_get(f"projects/{project}/aggregated/instances", params)
+        for scoped_list in data.get("items", {}).values():
+            instances.extend(scoped_list.get("instances", []))
+        if not data.get("nextPageToken"):
+            return instances
+        params["pageToken"] = data["nextPageToken"]
+
+
+def _list_instances_api(project: str) -> Optional[List[Dict[str, Any]]]:
+    """List instances through the Compute Engine API, or return None if it isn't usable."""
+    if USE_COMPUTE_SDK:
+        try:
+            return _list_instances_sdk(project)
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Compute SDK list failed: {str(e)}{Fore.RESET}")
+    
+    if USE_REQUESTS:
+        try:
+            return _list_instances_rest(project)
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Compute REST list failed: {str(e)}{Fore.RESET}")
+    
+    return None
+
+
 def get_vm_status(project: str, vm_name: str, zone: str) -> str:
     """Get the status of a VM."""
-    cmd = ["gcloud", "compute", "instances", "describe", vm_name,
+    if USE_REQUESTS:
+        try:
+            data = compute_api_get(f"projects/{project}/zones/{zone}/instances/{vm_name}",
+                                   {"fields": "status"})
+            return data.get("status", "UNKNOWN")
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Compute REST describe failed, falling back to gcloud: {str(e)}{Fore.RESET}")
+    
+    cmd = [*_GCLOUD_INSTANCE_PREFIX, "describe", vm_name,
            "--project", project, "--zone", zone,
-           "--format", "json(status)"]
+           "--format", "value(status)"]
     
     code, stdout, stderr = run_command(cmd)
     
     if code != 0:
         return "ERROR"
     
-    try:
-        data = json.loads(stdout)
-        return data.get("status", "UNKNOWN")
-    except:
-        return "UNKNOWN"
+    return stdout.strip() or "UNKNOWN"
+
+
+def cache_vm_status(project: str, vm_name: str, zone: str, status: str) -> None:
+    """Store a freshly fetched VM status in the in-memory cache."""
+    _status_cache[(project, zone, vm_name)] = (status, time.monotonic())
+
+
+def invalidate_vm_status(project: str, vm_name: str, zone: str) -> None:
+    """Drop a cached VM status so the next lookup queries gcloud again."""
+    _status_cache.pop((project, zone, vm_name), None)
+
+
+def get_vm_status_cached(project: str, vm_name: str, zone: str,
+                         ttl: float = STATUS_CACHE_TTL) -> str:
+    """Get the status of a VM, reusing a recently fetched value when available.
+    
+    On a miss the whole project is listed once, which refreshes the status of every
+    VM in it; a single describe call is only used if the project was listed recently
+    (e.g. the VM was just invalidated) or the VM isn't in the listing.
+    """
+    now = time.monotonic()
+    key = (project, zone, vm_name)
+    cached = _status_cache.get(key)
+    if cached and now - cached[1] < ttl:
+        return cached[0]
+    
+    listed_at = _status_listed_at.get(project)
+    if listed_at is None or now - listed_at >= ttl:
+        # The listing caches every VM by zone, so a same-named VM elsewhere can't answer this one
+        get_all_vm_statuses(project)
+        cached = _status_cache.get(key)
+        if cached and cached[1] >= now:
+            return cached[0]
+    
+    status = get_vm_status(project, vm_name, zone)
+    # Don't cache failures, so the next redraw retries the lookup
+    if status != "ERROR":
+        cache_vm_status(project, vm_name, zone, status)
+    return status
 
 
 def get_all_vm_statuses(project: str) -> Dict[str, str]:
     """Get statuses for all VMs in a project."""
-    cmd = ["gcloud", "compute", "instances", "list",
-           "--project", project,
-           "--format", "json(name,status,zone)"]
-    
-    code, stdout, stderr = run_command(cmd)
+    instances = _list_instances_api(project)
     
-    if code != 0:
-        print(f"{Fore.RED}Failed to get VM statuses: {stderr}{Fore.RESET}")
-        return {}
+    stdout = b""
+    if instances is None:
+        cmd = [*_GCLOUD_INSTANCE_PREFIX, "list",
+               "--project", project,
+               "--format", "json(name,status,zone)"]
+        
+        # The output is only parsed, so hand the raw bytes to json_loads
+        code, stdout, stderr = run_command(cmd, binary=True)
+        
+        if code != 0:
+            print(f"{Fore.RED}Failed to get VM statuses: {stderr}{Fore.RESET}")
+            return {}
     
     statuses = {}
     try:
-        instances = json.loads(stdout)
+        if instances is None:
+            instances = json_loads(stdout)
         for instance in instances:
             name = instance.get("name", "")
             status = instance.get("status", "UNKNOWN")
+            zone = instance.get("zone", "").split('/')[-1]
             statuses[name] = status
+            cache_vm_status(project, name, zone, status)
             
             # Debug information to see all available VMs
             if "debug" in sys.argv:
-                zone = instance.get("zone", "").split('/')[-1]
                 print(f"Found VM: {name} in zone {zone} with status {status}")
+        _status_listed_at[project] = time.monotonic()
     except Exception as e:
         print(f"{Fore.RED}Error parsing VM statuses: {str(e)}{Fore.RESET}")
         if "debug" in sys.argv:
-            print(f"Raw output: {stdout}")
+            print(f"Raw output: {stdout.decode('utf-8', errors='replace')}")
     
     return statuses
 
 
+def get_all_vm_statuses_multi(
+        projects: List[str],
+        on_result: Optional[Callable[[str, Dict[str, str]], None]] = None
+) -> Dict[str, Dict[str, str]]:
+    """Get statuses for all VMs in several projects, querying them in parallel.
+    
+    If given, on_result is called with (project, statuses) as each project finishes.
+    """
+    results = {}
+    if not projects:
+        return results
+    
+    with ThreadPoolExecutor(max_workers=min(16, len(projects))) as executor:
+        futures = {executor.submit(get_all_vm_statuses, project): project for project in projects}
+        for future in as_completed(futures):
+            project = futures[future]
+            try:
+                statuses = future.result()
+            except Exception as e:
+                print(f"{Fore.RED}Failed to get VM statuses for {project}: {str(e)}{Fore.RESET}")
+                statuses = {}
+            results[project] = statuses
+            if on_result:
+                on_result(project, statuses)
+    
+    return results
+
+
+def _build_header_template() -> str:
+    """Build the header text; {clear} and {now} are filled in on each redraw."""
+    return (f"{{clear}}"
+            f"{Fore.CYAN}{Style.BRIGHT}{'=' * 60}\n"
+            f"           GCP VM MANAGER v1.1\n"
+            f"{'=' * 60}{Style.RESET_ALL}\n"
+            f"{Fore.BLUE}Current time: {{now}}{Fore.RESET}\n"
+            f"\n")
+
+
 def print_header():
     """Print the application header."""
-    os.system('clear' if os.name == 'posix' else 'cls')
-    print(f"{Fore.CYAN}{Style.BRIGHT}{'=' * 60}")
-    print(f"           GCP VM MANAGER v1.1")
-    print(f"{'=' * 60}{Style.RESET_ALL}")
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.BLUE}Current time: {now}{Fore.RESET}")
-    print()
+    global _header_template
+    if _header_template is None:
+        _header_template = _build_header_template()
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    # One write clears the screen and draws the header, instead of a shell call plus several prints
+    # Only clear real terminals, so piped output doesn't fill up with escape codes
+    clear = CLEAR_SCREEN if sys.stdout.isatty() else ""
+    sys.stdout.write(_header_template.format(clear=clear, now=now))
+    sys.stdout.flush()
 
 
-def display_main_menu() -> int:
-    """Display the main menu and let user select an option."""
-    print_header()
-    print(f"{Fore.YELLOW}{Style.BRIGHT}Main Menu:{Style.RESET_ALL}")
-    print(f"1) Manage Virtual Machines")
-    print(f"2) Connect to Cloud Run Instances")
-    print(f"3) Manage Projects")
-    print(f"0) Exit")
+@overload
+def _prompt_choice(prompt: str, max_n: int, *, min_n: int = 0) -> int: ...
+@overload
+def _prompt_choice(prompt: str, max_n: int, extra: Tuple[str, ...], *, min_n: int = 0) -> Union[int, str]: ...
+
+
+def _prompt_choice(prompt: str, max_n: int, extra: Tuple[str, ...] = (), *,
+                   min_n: int = 0) -> Union[int, str]:
+    """Ask until the user enters a number from min_n to max_n (or one of the extra keys).
     
+    Returns the number, or the lowercased extra key; without extra keys it is always an int.
+    """
     while True:
+        answer = input(prompt).strip()
+        if answer.lower() in extra:
+            return answer.lower()
         try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-3): {Fore.RESET}")
-            choice = int(choice)
-            if 0 <= choice <= 3:
-                return choice
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
+            choice = int(answer)
         except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+            print(_MSG_NUMBER)
+            continue
+        if min_n <= choice <= max_n:
+            return choice
+        print(_MSG_INVALID)
+
+
+def display_main_menu() -> int:
+    """Display the main menu and let user select an option."""
+    print_header()
+    sys.stdout.write("\n".join([
+        f"{Fore.YELLOW}{Style.BRIGHT}Main Menu:{Style.RESET_ALL}",
+        "1) Manage Virtual Machines",
+        "2) Connect to Cloud Run Instances",
+        "3) Manage Projects",
+        "4) VM Status Overview (all projects)",
+        "0) Exit",
+        ""
+    ]))
+    sys.stdout.flush()
+    
+    return _prompt_choice(f"\n{CYAN}Enter your choice (0-4): {RESET}", 4)
 
 
 def display_projects(config_file: str = None) -> int:
@@ -227,37 +996,158 @@ def display_projects(config_file: str = None) -> int:
     
     print(f"0) Back to main menu")
     
-    while True:
-        try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-{len(projects)}): {Fore.RESET}")
-            choice = int(choice)
-            if 0 <= choice <= len(projects):
-                return choice
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+    return _prompt_choice(f"\n{CYAN}Enter your choice (0-{len(projects)}): {RESET}", len(projects))
+
+
+def display_vm_overview(config_file: str = None) -> None:
+    """Display the status of every VM across all configured projects."""
+    print_header()
+    print(f"{Fore.YELLOW}{Style.BRIGHT}VM Status Overview{Style.RESET_ALL}")
+    
+    projects = get_project_list(config_file)
+    if not projects:
+        print(f"{Fore.YELLOW}No projects configured. Please add a project first.{Fore.RESET}")
+        input("Press Enter to continue...")
+        return
+    
+    print(f"{Fore.BLUE}Loading VM statuses for {len(projects)} project(s)...{Fore.RESET}")
+    
+    if USE_RICH:
+        from rich.table import Table
+        from rich.live import Live
+        table = Table(title="VMs in all projects")
+        table.add_column("Project", style="cyan")
+        table.add_column("Name", style="green")
+        table.add_column("Status", style="magenta")
+        
+        # Rows are added as each project's listing completes
+        with Live(table, console=get_console(), refresh_per_second=4) as live:
+            def add_rows(project: str, statuses: Dict[str, str]) -> None:
+                for name in sorted(statuses):
+                    status = statuses[name]
+                    status_color = "[green]" if status == "RUNNING" else "[red]" if status == "STOPPED" or status == "TERMINATED" else "[yellow]"
+                    table.add_row(project, name, f"{status_color}{status}[/]")
+                live.refresh()
+            
+            get_all_vm_statuses_multi(projects, on_result=add_rows)
+    else:
+        # Fallback for when rich is not installed
+        print(f"{'Project':<40} {'Name':<60} {'Status':<10}")
+        print("-" * 112)
+        
+        def add_rows(project: str, statuses: Dict[str, str]) -> None:
+            for name in sorted(statuses):
+                status = statuses[name]
+                status_color = Fore.GREEN if status == "RUNNING" else Fore.RED if status == "STOPPED" or status == "TERMINATED" else Fore.YELLOW
+                print(f"{project:<40} {name:<60} {status_color}{status:<10}{Fore.RESET}")
+        
+        get_all_vm_statuses_multi(projects, on_result=add_rows)
+    
+    input("\nPress Enter to continue...")
+
 
+def invalidate_vm_list(project: str) -> None:
+    """Drop a cached VM list so the next VM table lists the project again."""
+    _vm_list_cache.pop(project, None)
 
-def display_vms(project: str, config_file: str = None) -> Tuple[Optional[Dict[str, Any]], int]:
-    """Display VMs for a project and let user select one."""
+
+def _fetch_vms(project: str, config_file: str = None) -> Optional[List[Dict[str, Any]]]:
+    """List the VMs of a project from GCP, sorted by name, or None if listing failed.
+    
+    VMs not yet in the configuration are added to it so they can get descriptions.
+    """
     print_header()
     print(f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}")
     print(f"{Fore.BLUE}Loading VM statuses and information...{Fore.RESET}")
     
-    # Always get VMs directly from GCP to ensure we have the complete list
+    # Get VMs directly from GCP to ensure we have the complete list
     vms = []
-    cmd = ["gcloud", "compute", "instances", "list",
+    cmd = [*_GCLOUD_INSTANCE_PREFIX, "list",
            "--project", project,
            "--format", "json(name,zone,machineType,status,networkInterfaces[0].networkIP)"]
     
-    code, stdout, stderr = run_command(cmd)
+    # Load configuration to check for stored VM descriptions
+    config = load_config(config_file)
+    project_config = config.get("projects", {}).get(project, {})
+    configured_vms = list(project_config.get("vms", []))
+    # Index configured VMs by (name, zone) so each instance is matched in O(1)
+    configured_index = {(vm_info.get("name"), vm_info.get("zone")): vm_info for vm_info in configured_vms}
+    config_changed = False
+    
+    def add_instance(instance: Dict[str, Any]) -> None:
+        nonlocal config_changed
+        name = instance.get("name", "")
+        zone_path = instance.get("zone", "")
+        zone = zone_path.split('/')[-1] if zone_path else "Unknown"
+        region = zone[:-2] if zone and len(zone) > 2 else "Unknown"  # Extract region from zone
+        machine_type_path = instance.get("machineType")
+        machine_type = machine_type_path.split('/')[-1] if machine_type_path else "Unknown"
+        status = instance.get("status", "UNKNOWN")
+        
+        # Map regions to more friendly names
+        match = _REGION_RE.match(region)
+        region_display = REGION_DISPLAY_NAMES[match.group(0)] if match else region
+        
+        # Check if this VM matches one in our configuration (for descriptions)
+        existing = configured_index.get((name, zone))
+        description = f"{machine_type} instance"
+        if existing is not None:
+            description = existing.get("description", description)
+        
+        # Store the VM information
+        vms.append({
+            "name": name,
+            "zone": zone,
+            "region": region_display,
+            "status": status,
+            "description": description
+        })
+        cache_vm_status(project, name, zone, status)
+        
+        # Also store this VM in the configuration if it's not already there
+        if existing is None:
+            vm_info = {
+                "name": name,
+                "zone": zone,
+                "region": region_display,
+                "description": description
+            }
+            configured_vms.append(vm_info)
+            configured_index[(name, zone)] = vm_info
+            config_changed = True
+        
+        # Debug information for each VM
+        if "debug" in sys.argv:
+            print(f"{Fore.BLUE}[DEBUG] Found VM: {name} in zone {zone} with status {status}{Fore.RESET}")
+    
+    # Instances are processed as gcloud streams them instead of after the whole list arrives
+    if USE_RICH:
+        from rich.table import Table
+        from rich.live import Live
+        # Show each VM as soon as it arrives; the table is replaced by the numbered one afterwards
+        progress = Table(title=f"Loading VMs in {project}...")
+        progress.add_column("Name", style="green")
+        progress.add_column("Region", style="yellow")
+        progress.add_column("Zone", style="blue")
+        progress.add_column("Status", style="magenta")
+        
+        with Live(progress, console=get_console(), refresh_per_second=4, transient=True):
+            def show_instance(instance: Dict[str, Any]) -> None:
+                add_instance(instance)
+                vm = vms[-1]
+                status = vm["status"]
+                status_color = "[green]" if status == "RUNNING" else "[red]" if status == "STOPPED" or status == "TERMINATED" else "[yellow]"
+                # Live redraws on its own refresh_per_second timer, so rows aren't redrawn one by one
+                progress.add_row(vm["name"], vm["region"], vm["zone"], f"{status_color}{status}[/]")
+            
+            code, stderr, parse_error = stream_command_json(cmd, show_instance)
+    else:
+        code, stderr, parse_error = stream_command_json(cmd, add_instance)
     
     # Debug information
     if "debug" in sys.argv:
         print(f"{Fore.BLUE}[DEBUG] Command: {' '.join(cmd)}{Fore.RESET}")
         print(f"{Fore.BLUE}[DEBUG] Exit code: {code}{Fore.RESET}")
-        print(f"{Fore.BLUE}[DEBUG] stdout: {stdout}{Fore.RESET}")
         if stderr:
             print(f"{Fore.RED}[DEBUG] stderr: {stderr}{Fore.RESET}")
     
@@ -269,99 +1159,53 @@ def display_vms(project: str, config_file: str = None) -> Tuple[Optional[Dict[st
         print("3. Verify the project ID is correct")
         print("4. Try running the command manually: gcloud compute instances list --project " + project)
         input("Press Enter to return to project selection...")
-        return None, 0
+        return None
     
-    try:
-        instances = json.loads(stdout)
-        if not instances:
-            print(f"{Fore.YELLOW}No VMs found in this project.{Fore.RESET}")
-            print(f"{Fore.YELLOW}Troubleshooting tips:{Fore.RESET}")
-            print("1. Verify the project ID is correct")
-            print("2. Check if you're looking at the right project")
-            print("3. Try running: gcloud compute instances list --project " + project)
-            input("Press Enter to return to project selection...")
-            return None, 0
-            
-        statuses = {}
-        # Load configuration to check for stored VM descriptions
-        config = load_config(config_file)
-        project_config = config.get("projects", {}).get(project, {})
-        configured_vms = project_config.get("vms", [])
-        
-        for instance in instances:
-            name = instance.get("name", "")
-            zone_path = instance.get("zone", "")
-            zone = zone_path.split('/')[-1] if zone_path else "Unknown"
-            region = zone[:-2] if zone and len(zone) > 2 else "Unknown"  # Extract region from zone
-            machine_type = instance.get("machineType", "").split('/')[-1] if instance.get("machineType") else "Unknown"
-            status = instance.get("status", "UNKNOWN")
-            
-            # Map regions to more friendly names
-            region_display = region
-            if region.startswith("us-central"):
-                region_display = "US Central"
-            elif region.startswith("us-west"):
-                region_display = "US West"
-            elif region.startswith("us-east"):
-                region_display = "US East"
-            elif region.startswith("europe"):
-                region_display = "Europe"
-            elif region.startswith("asia"):
-                region_display = "Asia"
-            
-            # Check if this VM matches one in our configuration (for descriptions)
-            description = f"{machine_type} instance"
-            for vm_info in configured_vms:
-                if vm_info.get("name") == name and vm_info.get("zone") == zone:
-                    description = vm_info.get("description", description)
-                    break
-            
-            # Store the VM information
-            vms.append({
-                "name": name,
-                "zone": zone,
-                "region": region_display,
-                "status": status,
-                "description": description
-            })
-            statuses[name] = status
-            
-            # Also store this VM in the configuration if it's not already there
-            vm_exists = False
-            for vm_info in configured_vms:
-                if vm_info.get("name") == name and vm_info.get("zone") == zone:
-                    vm_exists = True
-                    break
-            
-            if not vm_exists:
-                configured_vms.append({
-                    "name": name,
-                    "zone": zone,
-                    "region": region_display,
-                    "description": description
-                })
-            
-            # Debug information for each VM
-            if "debug" in sys.argv:
-                print(f"{Fore.BLUE}[DEBUG] Found VM: {name} in zone {zone} with status {status}{Fore.RESET}")
-        
-        # Save the updated configuration
-        if project_config.get("vms") != configured_vms:
-            project_config["vms"] = configured_vms
-            config["projects"][project] = project_config
-            save_config(config, config_file)
-        
-        # Sort VMs by name
-        vms.sort(key=lambda x: x["name"])
-        
-    except Exception as e:
-        print(f"{Fore.RED}Error parsing VM list: {str(e)}{Fore.RESET}")
+    if parse_error is not None:
+        print(f"{Fore.RED}Error parsing VM list: {str(parse_error)}{Fore.RESET}")
         if "debug" in sys.argv:
-            print(f"{Fore.RED}[DEBUG] Raw output: {stdout}{Fore.RESET}")
-            import traceback
-            traceback.print_exc()
+            traceback.print_exception(type(parse_error), parse_error, parse_error.__traceback__)
         input("Press Enter to return to project selection...")
-        return None, 0
+        return None
+    
+    if not vms:
+        print(f"{Fore.YELLOW}No VMs found in this project.{Fore.RESET}")
+        print(f"{Fore.YELLOW}Troubleshooting tips:{Fore.RESET}")
+        print("1. Verify the project ID is correct")
+        print("2. Check if you're looking at the right project")
+        print("3. Try running: gcloud compute instances list --project " + project)
+        input("Press Enter to return to project selection...")
+        return None
+    
+    _status_listed_at[project] = time.monotonic()
+    
+    # Save the updated configuration (only when new VMs were discovered)
+    if config_changed:
+        project_config["vms"] = configured_vms
+        config["projects"][project] = project_config
+        save_config(config, config_file)
+    
+    # Sort VMs by name
+    vms.sort(key=lambda x: x["name"])
+    return vms
+
+
+def display_vms(project: str, config_file: str = None,
+                refresh: bool = False) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Display VMs for a project and let user select one.
+    
+    The VM list is reused for VM_LIST_CACHE_TTL seconds, so coming back from the VM
+    actions menu doesn't list the project again; refresh (or 'r' at the prompt) forces it.
+    """
+    cached = None if refresh else _vm_list_cache.get(project)
+    if cached and time.monotonic() - cached[1] < VM_LIST_CACHE_TTL:
+        vms = cached[0]
+    else:
+        vms = _fetch_vms(project, config_file)
+        if vms is None:
+            invalidate_vm_list(project)
+            return None, 0
+        _vm_list_cache[project] = (vms, time.monotonic())
     
     print_header()
     print(f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}")
@@ -374,6 +1218,7 @@ def display_vms(project: str, config_file: str = None) -> Tuple[Optional[Dict[st
     
     # Display VM table
     if USE_RICH:
+        from rich.table import Table
         table = Table(title=f"VMs in {project}")
         table.add_column("#", style="cyan")
         table.add_column("Name", style="green")
@@ -396,7 +1241,7 @@ def display_vms(project: str, config_file: str = None) -> Tuple[Optional[Dict[st
                 vm.get("description", "")
             )
         
-        console.print(table)
+        get_console().print(table)
     else:
         # Fallback for when rich is not installed
         print(f"{'#':<3} {'Name':<60} {'Region':<15} {'Zone':<20} {'Status':<10} {'Description'}")
@@ -411,22 +1256,83 @@ def display_vms(project: str, config_file: str = None) -> Tuple[Optional[Dict[st
                   f"{status_color}{status:<10}{Fore.RESET} {vm.get('description', '')}")
     
     print(f"0) Back to project selection")
+    print(f"r) Refresh VM list")
     
-    while True:
+    choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-{len(vms)}, r to refresh): {RESET}",
+                            len(vms), extra=("r",))
+    if choice == "r":
+        return display_vms(project, config_file, refresh=True)
+    if choice == 0:
+        return None, 0
+    return vms[choice-1], choice
+
+
+def bulk_vm_action_menu(project: str, config_file: str = None):
+    """Let the user start, stop or reset several VMs of a project at once."""
+    print_header()
+    print(f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}")
+    print(f"{Fore.BLUE}Loading VM statuses...{Fore.RESET}")
+    
+    # Only offer VMs that still exist; zones come from the configuration
+    statuses = get_all_vm_statuses(project)
+    configured_vms = load_config(config_file).get("projects", {}).get(project, {}).get("vms", [])
+    vms = sorted((vm for vm in configured_vms if vm.get("name") in statuses),
+                 key=lambda x: x["name"])
+    
+    if not vms:
+        print(f"{Fore.RED}No VMs found in this project.{Fore.RESET}")
+        input("Press Enter to continue...")
+        return
+    
+    print(f"\n{Fore.CYAN}VMs in {project}:{Fore.RESET}")
+    for i, vm in enumerate(vms, 1):
+        print(f"{i}) {vm['name']} ({vm['zone']}) - {statuses[vm['name']]}")
+    
+    print(f"\n{Fore.CYAN}Select an action:{Fore.RESET}")
+    print(f"1) Start VMs")
+    print(f"2) Stop VMs")
+    print(f"3) Reset VMs")
+    print(f"0) Cancel")
+    
+    action_choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-3): {RESET}", 3)
+    actions = {1: "start", 2: "stop", 3: "reset"}
+    if action_choice not in actions:
+        return
+    action = actions[action_choice]
+    
+    selection = input(f"{Fore.CYAN}Enter VM numbers separated by commas (or 'all'): {Fore.RESET}").strip()
+    if selection.lower() == "all":
+        selected = vms
+    else:
         try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-{len(vms)}): {Fore.RESET}")
-            choice = int(choice)
-            if 0 <= choice <= len(vms):
-                if choice == 0:
-                    return None, 0
-                return vms[choice-1], choice
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
+            indexes = [int(part) for part in selection.split(",") if part.strip()]
         except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+            indexes = []
+        if not indexes or any(not 1 <= i <= len(vms) for i in indexes):
+            print(f"{Fore.RED}Invalid selection.{Fore.RESET}")
+            input("Press Enter to continue...")
+            return
+        selected = [vms[i - 1] for i in indexes]
+    
+    confirm = input(f"{Fore.YELLOW}{action.capitalize()} {len(selected)} VM(s)? (y/N): {Fore.RESET}")
+    if confirm.lower() != 'y':
+        return
+    
+    print(f"{Fore.YELLOW}Sending {action} requests for {len(selected)} VM(s)...{Fore.RESET}")
+    results = bulk_vm_action(project, selected, action)
+    invalidate_vm_list(project)
+    
+    for (vm_name, zone), error in sorted(results.items()):
+        invalidate_vm_status(project, vm_name, zone)
+        if error is None:
+            print(f"{Fore.GREEN}{vm_name}: {action} completed successfully.{Fore.RESET}")
+        else:
+            print(f"{Fore.RED}{vm_name}: {error}{Fore.RESET}")
+    
+    input("\nPress Enter to continue...")
 
 
-def vm_action_menu(project: str, vm: Dict[str, Any]) -> int:
+def vm_action_menu(project: str, vm: Dict[str, Any], config_file: str = None) -> int:
     """Display actions for a selected VM."""
     vm_name = vm["name"]
     zone = vm["zone"]
@@ -436,8 +1342,8 @@ def vm_action_menu(project: str, vm: Dict[str, Any]) -> int:
         print(f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}")
         print(f"{Fore.GREEN}{Style.BRIGHT}VM: {vm_name} ({zone}){Style.RESET_ALL}")
         
-        # Get current VM status
-        status = get_vm_status(project, vm_name, zone)
+        # Get current VM status (reuses the status fetched by the VM list when fresh)
+        status = get_vm_status_cached(project, vm_name, zone)
         if status == "RUNNING":
             status_text = f"{Fore.GREEN}{status}{Fore.RESET}"
         elif status == "TERMINATED" or status == "STOPPED":
@@ -445,76 +1351,77 @@ def vm_action_menu(project: str, vm: Dict[str, Any]) -> int:
         else:
             status_text = f"{Fore.YELLOW}{status}{Fore.RESET}"
         
-        print(f"Status: {status_text}")
-        print()
-        
-        print(f"{Fore.CYAN}Select an action:{Fore.RESET}")
-        print(f"1) SSH into VM")
-        
         if status == "RUNNING":
-            print(f"2) Stop VM")
-            print(f"3) Reset VM")
-            print(f"4) Configure Port Forwarding")
+            state_actions = ["2) Stop VM",
+                             "3) Reset VM",
+                             "4) Configure Port Forwarding"]
         elif status == "TERMINATED" or status == "STOPPED":
-            print(f"2) Start VM")
-            print(f"3) [Disabled] Reset VM")
-            print(f"4) [Disabled] Configure Port Forwarding")
+            state_actions = ["2) Start VM",
+                             "3) [Disabled] Reset VM",
+                             "4) [Disabled] Configure Port Forwarding"]
         else:
-            print(f"2) [Disabled] Stop VM")
-            print(f"3) [Disabled] Reset VM")
-            print(f"4) [Disabled] Configure Port Forwarding")
+            state_actions = ["2) [Disabled] Stop VM",
+                             "3) [Disabled] Reset VM",
+                             "4) [Disabled] Configure Port Forwarding"]
         
-        print(f"5) View VM details")
-        print(f"6) View VM logs")
-        print(f"7) Upload file to VM")
-        print(f"8) Download file from VM")
-        print(f"9) Run command on VM")
-        print(f"0) Back to VM selection")
+        sys.stdout.write("\n".join([
+            f"Status: {status_text}",
+            "",
+            f"{Fore.CYAN}Select an action:{Fore.RESET}",
+            "1) SSH into VM",
+            *state_actions,
+            "5) View VM details",
+            "6) View VM logs",
+            "7) Upload file to VM",
+            "8) Download file from VM",
+            "9) Run command on VM",
+            "10) Bulk start/stop VMs in this project",
+            "0) Back to VM selection",
+            ""
+        ]))
+        sys.stdout.flush()
         
-        try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-9): {Fore.RESET}")
-            choice = int(choice)
-            
-            if choice == 0:
-                return 0
-            elif choice == 1:
-                ssh_to_vm(project, vm_name, zone)
-            elif choice == 2:
-                if status == "RUNNING":
-                    stop_vm(project, vm_name, zone)
-                elif status == "TERMINATED" or status == "STOPPED":
-                    start_vm(project, vm_name, zone)
-                else:
-                    print(f"{Fore.RED}Cannot perform this action while VM is in {status} state.{Fore.RESET}")
-                    input("Press Enter to continue...")
-            elif choice == 3:
-                if status == "RUNNING":
-                    reset_vm(project, vm_name, zone)
-                else:
-                    print(f"{Fore.RED}Cannot reset VM while it's in {status} state.{Fore.RESET}")
-                    input("Press Enter to continue...")
-            elif choice == 4:
-                if status == "RUNNING":
-                    configure_port_forwarding(project, vm_name, zone)
-                else:
-                    print(f"{Fore.RED}Cannot configure port forwarding while VM is in {status} state.{Fore.RESET}")
-                    input("Press Enter to continue...")
-            elif choice == 5:
-                view_vm_details(project, vm_name, zone)
-            elif choice == 6:
-                view_vm_logs(project, vm_name, zone)
-            elif choice == 7:
-                upload_file_to_vm(project, vm_name, zone)
-            elif choice == 8:
-                download_file_from_vm(project, vm_name, zone)
-            elif choice == 9:
-                run_command_on_vm(project, vm_name, zone)
+        choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-10): {RESET}", 10)
+        
+        if choice == 0:
+            return 0
+        elif choice == 1:
+            ssh_to_vm(project, vm_name, zone)
+        elif choice == 2:
+            if status == "RUNNING":
+                stop_vm(project, vm_name, zone)
+                invalidate_vm_status(project, vm_name, zone)
+            elif status == "TERMINATED" or status == "STOPPED":
+                start_vm(project, vm_name, zone)
+                invalidate_vm_status(project, vm_name, zone)
             else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
+                print(f"{Fore.RED}Cannot perform this action while VM is in {status} state.{Fore.RESET}")
                 input("Press Enter to continue...")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
-            input("Press Enter to continue...")
+        elif choice == 3:
+            if status == "RUNNING":
+                reset_vm(project, vm_name, zone)
+                invalidate_vm_status(project, vm_name, zone)
+            else:
+                print(f"{Fore.RED}Cannot reset VM while it's in {status} state.{Fore.RESET}")
+                input("Press Enter to continue...")
+        elif choice == 4:
+            if status == "RUNNING":
+                configure_port_forwarding(project, vm_name, zone)
+            else:
+                print(f"{Fore.RED}Cannot configure port forwarding while VM is in {status} state.{Fore.RESET}")
+                input("Press Enter to continue...")
+        elif choice == 5:
+            view_vm_details(project, vm_name, zone)
+        elif choice == 6:
+            view_vm_logs(project, vm_name, zone)
+        elif choice == 7:
+            upload_file_to_vm(project, vm_name, zone)
+        elif choice == 8:
+            download_file_from_vm(project, vm_name, zone)
+        elif choice == 9:
+            run_command_on_vm(project, vm_name, zone)
+        elif choice == 10:
+            bulk_vm_action_menu(project, config_file)
 
 
 def ssh_to_vm(project: str, vm_name: str, zone: str):
@@ -530,15 +1437,15 @@ def ssh_to_vm(project: str, vm_name: str, zone: str):
 def start_vm(project: str, vm_name: str, zone: str):
     """Start a VM."""
     print(f"{Fore.YELLOW}Starting {vm_name}...{Fore.RESET}")
-    cmd = ["gcloud", "compute", "instances", "start", vm_name,
-           "--project", project, "--zone", zone]
-    
-    code, stdout, stderr = run_command(cmd)
+    code, stdout, stderr = run_instance_action(project, vm_name, zone, "start")
+    # The VM table shows statuses, so list the project again next time
+    invalidate_vm_list(project)
     
     if code == 0:
         print(f"{Fore.GREEN}VM started successfully.{Fore.RESET}")
     else:
-        print(f"{Fore.RED}Failed to start VM: {stderr}{Fore.RESET}")
+        # Without captured output gcloud has already printed the error
+        print(f"{Fore.RED}Failed to start VM{': ' + stderr if stderr else '.'}{Fore.RESET}")
     
     input("Press Enter to continue...")
 
@@ -546,15 +1453,15 @@ def start_vm(project: str, vm_name: str, zone: str):
 def stop_vm(project: str, vm_name: str, zone: str):
     """Stop a VM."""
     print(f"{Fore.YELLOW}Stopping {vm_name}...{Fore.RESET}")
-    cmd = ["gcloud", "compute", "instances", "stop", vm_name,
-           "--project", project, "--zone", zone]
-    
-    code, stdout, stderr = run_command(cmd)
+    code, stdout, stderr = run_instance_action(project, vm_name, zone, "stop")
+    # The VM table shows statuses, so list the project again next time
+    invalidate_vm_list(project)
     
     if code == 0:
         print(f"{Fore.GREEN}VM stopped successfully.{Fore.RESET}")
     else:
-        print(f"{Fore.RED}Failed to stop VM: {stderr}{Fore.RESET}")
+        # Without captured output gcloud has already printed the error
+        print(f"{Fore.RED}Failed to stop VM{': ' + stderr if stderr else '.'}{Fore.RESET}")
     
     input("Press Enter to continue...")
 
@@ -562,15 +1469,15 @@ def stop_vm(project: str, vm_name: str, zone: str):
 def reset_vm(project: str, vm_name: str, zone: str):
     """Reset a VM."""
     print(f"{Fore.YELLOW}Resetting {vm_name}...{Fore.RESET}")
-    cmd = ["gcloud", "compute", "instances", "reset", vm_name,
-           "--project", project, "--zone", zone]
-    
-    code, stdout, stderr = run_command(cmd)
+    code, stdout, stderr = run_instance_action(project, vm_name, zone, "reset")
+    # The VM table shows statuses, so list the project again next time
+    invalidate_vm_list(project)
     
     if code == 0:
         print(f"{Fore.GREEN}VM reset successfully.{Fore.RESET}")
     else:
-        print(f"{Fore.RED}Failed to reset VM: {stderr}{Fore.RESET}")
+        # Without captured output gcloud has already printed the error
+        print(f"{Fore.RED}Failed to reset VM{': ' + stderr if stderr else '.'}{Fore.RESET}")
     
     input("Press Enter to continue...")
 
@@ -578,24 +1485,22 @@ def reset_vm(project: str, vm_name: str, zone: str):
 def view_vm_details(project: str, vm_name: str, zone: str):
     """View detailed information about a VM."""
     print(f"{Fore.YELLOW}Loading VM details...{Fore.RESET}")
-    cmd = ["gcloud", "compute", "instances", "describe", vm_name,
+    cmd = [*_GCLOUD_INSTANCE_PREFIX, "describe", vm_name,
            "--project", project, "--zone", zone,
            "--format", "json"]
     
     code, stdout, stderr = run_command(cmd)
     
     if code == 0:
-        try:
-            details = json.loads(stdout)
-            
-            if USE_RICH:
-                console.print(details, highlight=True)
-            else:
-                # Format JSON for readability
-                details_str = json.dumps(details, indent=2)
-                print(details_str)
-        except:
-            print(f"{Fore.RED}Failed to parse VM details.{Fore.RESET}")
+        if USE_RICH:
+            try:
+                details = json_loads(stdout)
+                get_console().print(details, highlight=True)
+            except:
+                print(f"{Fore.RED}Failed to parse VM details.{Fore.RESET}")
+                print(stdout)
+        else:
+            # gcloud's JSON output is already indented, so there's no need to parse and re-dump it
             print(stdout)
     else:
         print(f"{Fore.RED}Failed to get VM details: {stderr}{Fore.RESET}")
@@ -606,16 +1511,17 @@ def view_vm_details(project: str, vm_name: str, zone: str):
 def view_vm_logs(project: str, vm_name: str, zone: str):
     """View logs from a VM."""
     print(f"{Fore.YELLOW}Loading VM logs...{Fore.RESET}")
-    cmd = ["gcloud", "compute", "instances", "get-serial-port-output", vm_name,
+    cmd = [*_GCLOUD_INSTANCE_PREFIX, "get-serial-port-output", vm_name,
            "--project", project, "--zone", zone]
     
     code, stdout, stderr = run_command(cmd)
     
     if code == 0:
         if USE_RICH:
+            from rich.panel import Panel
             # Create a panel with scrollable content
             panel = Panel(stdout, title=f"Logs for {vm_name}", width=120, height=30)
-            console.print(panel)
+            get_console().print(panel)
         else:
             print(stdout)
     else:
@@ -718,20 +1624,230 @@ def get_cloud_run_services(project: str) -> List[Dict[str, Any]]:
            "--project", project,
            "--format", "json"]
     
-    code, stdout, stderr = run_command(cmd)
+    code, stdout, stderr = run_command(cmd, binary=True)
     
     if code != 0:
         print(f"{Fore.RED}Failed to get Cloud Run services: {stderr}{Fore.RESET}")
         return []
     
     try:
-        services = json.loads(stdout)
+        services = json_loads(stdout)
         return services
     except:
         print(f"{Fore.RED}Failed to parse Cloud Run services.{Fore.RESET}")
         return []
 
 
+def service_summary(service: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Extract (name, region, url, status) from a Cloud Run service description."""
+    metadata = service.get("metadata") or {}
+    labels = metadata.get("labels") or {}
+    service_status = service.get("status") or {}
+    conditions = service_status.get("conditions") or [{}]
+    ready = conditions[0].get("status", "Unknown") == "True"
+    
+    return (metadata.get("name", "Unknown"),
+            labels.get("cloud.googleapis.com/location", "Unknown"),
+            service_status.get("url", "Unknown"),
+            "Ready" if ready else "Not Ready")
+
+
+def get_service_url(details: Dict[str, Any]) -> Optional[str]:
+    """Get the URL from Cloud Run service details (v2 SDK or v1 gcloud fields)."""
+    return details.get("uri") or (details.get("status") or {}).get("url")
+
+
+def ttl_cache(seconds: float, cache_if: Optional[Callable[[Any], bool]] = None):
+    """Memoize a function per positional arguments, keeping each result for `seconds`.
+    
+    Results for which cache_if returns False are not stored. The wrapped function
+    gets a cache_clear() method to drop everything it remembers.
+    """
+    def decorator(func):
+        cache: Dict[Tuple[Any, ...], Tuple[Any, float]] = {}
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            cached = cache.get(args)
+            if cached and now - cached[1] < seconds:
+                return cached[0]
+            result = func(*args)
+            if cache_if is None or cache_if(result):
+                cache[args] = (result, now)
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@ttl_cache(float("inf"), cache_if=lambda result: result[0] == 0)
+def get_gcloud_version() -> Tuple[int, str, str]:
+    """Run gcloud --version and return exit code, stdout, and stderr.
+    
+    The installed gcloud doesn't change while the tool runs, so a successful result
+    is kept for the rest of the process.
+    """
+    return run_command(["gcloud", "--version"])
+
+
+def get_run_services_client():
+    """Get the shared Cloud Run ServicesClient, creating it on first use."""
+    global _run_services_client
+    if _run_services_client is None:
+        with _client_lock:
+            if _run_services_client is None:
+                _run_services_client = run_v2.ServicesClient(credentials=get_credentials())
+    return _run_services_client
+
+
+def get_run_revisions_client():
+    """Get the shared Cloud Run RevisionsClient, creating it on first use."""
+    global _run_revisions_client
+    if _run_revisions_client is None:
+        with _client_lock:
+            if _run_revisions_client is None:
+                _run_revisions_client = run_v2.RevisionsClient(credentials=get_credentials())
+    return _run_revisions_client
+
+
+def get_logging_client():
+    """Get the shared Cloud Logging client, creating it on first use."""
+    global _logging_client
+    if _logging_client is None:
+        with _client_lock:
+            if _logging_client is None:
+                credentials = get_credentials()
+                _logging_client = logging_v2.Client(project=_default_project, credentials=credentials)
+    return _logging_client
+
+
+@ttl_cache(CLOUD_RUN_CACHE_TTL, cache_if=lambda result: result[0] is not None)
+def describe_cloud_run_service(project: str, service_name: str,
+                               region: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Describe a Cloud Run service and return (details, error); details is None on failure.
+    
+    Uses the Cloud Run SDK (v2 API fields) when it is installed and falls back to
+    gcloud (v1 API fields) otherwise. Successful lookups are reused for CLOUD_RUN_CACHE_TTL.
+    """
+    if USE_RUN_SDK:
+        try:
+            service = get_run_services_client().get_service(
+                name=f"projects/{project}/locations/{region}/services/{service_name}")
+            return run_v2.Service.to_dict(service, use_integers_for_enums=False), ""
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Cloud Run SDK describe failed, falling back to gcloud: {str(e)}{Fore.RESET}")
+    
+    cmd = ["gcloud", "run", "services", "describe", service_name,
+           "--project", project, "--region", region,
+           "--format", "json"]
+    
+    code, stdout, stderr = run_command(cmd, binary=True)
+    if code != 0:
+        return None, stderr
+    
+    try:
+        return json_loads(stdout), ""
+    except Exception as e:
+        return None, f"Failed to parse service details: {str(e)}"
+
+
+def _list_revisions_sdk(project: str, service_name: str, region: str) -> List[Dict[str, Any]]:
+    """List the revisions of a Cloud Run service through the SDK, newest first.
+    
+    Returns dicts shaped like the gcloud JSON output (metadata.name and the Ready condition).
+    """
+    revisions = get_run_revisions_client().list_revisions(
+        parent=f"projects/{project}/locations/{region}/services/{service_name}")
+    result = []
+    for revision in sorted(revisions, key=lambda r: r.create_time, reverse=True):
+        ready = any(condition.type_ == "Ready" and condition.state.name == "CONDITION_SUCCEEDED"
+                    for condition in revision.conditions)
+        result.append({
+            "metadata": {"name": revision.name.split('/')[-1]},
+            "status": {"conditions": [{"type": "Ready", "status": "True" if ready else "False"}]}
+        })
+    return result
+
+
+def _active_revisions(revisions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the revisions whose Ready condition is True, keeping their order."""
+    return [revision for revision in revisions
+            if any(condition.get("type") == "Ready" and condition.get("status") == "True"
+                   for condition in (revision.get("status") or {}).get("conditions") or [])]
+
+
+@ttl_cache(CLOUD_RUN_CACHE_TTL, cache_if=lambda result: result[0] is not None)
+def list_cloud_run_revisions(project: str, service_name: str,
+                             region: str) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """List the revisions of a Cloud Run service and return (revisions, error).
+    
+    Uses the Cloud Run SDK when it is installed and falls back to gcloud otherwise.
+    Successful listings are reused for CLOUD_RUN_CACHE_TTL.
+    """
+    if USE_RUN_SDK:
+        try:
+            return _list_revisions_sdk(project, service_name, region), ""
+        except Exception as e:
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Cloud Run SDK revisions list failed, falling back to gcloud: {str(e)}{Fore.RESET}")
+    
+    cmd = ["gcloud", "run", "revisions", "list",
+           "--service", service_name,
+           "--project", project, "--region", region,
+           "--format", "json"]
+    
+    code, stdout, stderr = run_command(cmd, binary=True)
+    if code != 0:
+        return None, stderr
+    
+    try:
+        return json_loads(stdout or b"[]"), ""
+    except Exception as e:
+        return None, f"Failed to parse revisions: {str(e)}"
+
+
+def stream_cloud_run_logs(project: str, service_name: str,
+                          on_entry: Callable[[Dict[str, Any]], None]) -> Optional[str]:
+    """Read the latest log entries of a Cloud Run service, calling on_entry for each as it arrives.
+    
+    Entries are shaped like the gcloud logging read JSON output, newest first. Uses
+    the Cloud Logging SDK (fetched page by page) when it is installed and falls back to
+    streaming gcloud's output otherwise. Returns None on success or an error message.
+    """
+    log_filter = f"resource.type=cloud_run_revision AND resource.labels.service_name={service_name}"
+    
+    if USE_LOGGING_SDK:
+        delivered = 0
+        try:
+            entries = get_logging_client().list_entries(
+                resource_names=[f"projects/{project}"], filter_=log_filter,
+                order_by=logging_v2.DESCENDING,
+                max_results=CLOUD_RUN_LOG_LIMIT, page_size=CLOUD_RUN_LOG_PAGE_SIZE)
+            for entry in entries:
+                on_entry(entry.to_api_repr())
+                delivered += 1
+            return None
+        except Exception as e:
+            # Once entries have been shown, falling back would show them twice
+            if delivered:
+                return str(e)
+            if "debug" in sys.argv:
+                print(f"{Fore.BLUE}[DEBUG] Cloud Logging SDK read failed, falling back to gcloud: {str(e)}{Fore.RESET}")
+    
+    cmd = ["gcloud", "logging", "read", log_filter,
+           f"--project={project}", f"--limit={CLOUD_RUN_LOG_LIMIT}", "--format=json"]
+    
+    code, stderr, parse_error = stream_command_json(cmd, on_entry)
+    if code != 0:
+        return stderr
+    if parse_error is not None:
+        return f"Failed to parse Cloud Run logs: {str(parse_error)}"
+    return None
+
+
 def display_cloud_run_services(project: str) -> Tuple[Optional[Dict[str, Any]], int]:
     """Display Cloud Run services for a project and let user select one."""
     print_header()
@@ -745,8 +1861,12 @@ def display_cloud_run_services(project: str) -> Tuple[Optional[Dict[str, Any]],
     
     print(f"{Fore.CYAN}Select a Cloud Run service:{Fore.RESET}")
     
+    # Extract the displayed fields once, for both table renderers
+    rows = [service_summary(service) for service in services]
+    
     # Display services table
     if USE_RICH:
+        from rich.table import Table
         table = Table(title=f"Cloud Run Services in {project}")
         table.add_column("#", style="cyan")
         table.add_column("Name", style="green")
@@ -754,11 +1874,7 @@ def display_cloud_run_services(project: str) -> Tuple[Optional[Dict[str, Any]],
         table.add_column("URL", style="blue")
         table.add_column("Status", style="magenta")
         
-        for i, service in enumerate(services, 1):
-            name = service.get("metadata", {}).get("name", "Unknown")
-            region = service.get("metadata", {}).get("labels", {}).get("cloud.googleapis.com/location", "Unknown")
-            url = service.get("status", {}).get("url", "Unknown")
-            status = "Ready" if service.get("status", {}).get("conditions", [{}])[0].get("status", "Unknown") == "True" else "Not Ready"
+        for i, (name, region, url, status) in enumerate(rows, 1):
             status_color = "[green]" if status == "Ready" else "[red]"
             
             table.add_row(
@@ -769,17 +1885,13 @@ def display_cloud_run_services(project: str) -> Tuple[Optional[Dict[str, Any]],
                 f"{status_color}{status}[/]"
             )
         
-        console.print(table)
+        get_console().print(table)
     else:
         # Fallback for when rich is not installed
         print(f"{'#':<3} {'Name':<40} {'Region':<15} {'URL':<50} {'Status':<10}")
         print("-" * 120)
         
-        for i, service in enumerate(services, 1):
-            name = service.get("metadata", {}).get("name", "Unknown")
-            region = service.get("metadata", {}).get("labels", {}).get("cloud.googleapis.com/location", "Unknown")
-            url = service.get("status", {}).get("url", "Unknown")
-            status = "Ready" if service.get("status", {}).get("conditions", [{}])[0].get("status", "Unknown") == "True" else "Not Ready"
+        for i, (name, region, url, status) in enumerate(rows, 1):
             status_color = Fore.GREEN if status == "Ready" else Fore.RED
             
             print(f"{i:<3} {name:<40} {region:<15} {url:<50} "
@@ -787,54 +1899,40 @@ def display_cloud_run_services(project: str) -> Tuple[Optional[Dict[str, Any]],
     
     print(f"0) Back to project selection")
     
-    while True:
-        try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-{len(services)}): {Fore.RESET}")
-            choice = int(choice)
-            if 0 <= choice <= len(services):
-                if choice == 0:
-                    return None, 0
-                return services[choice-1], choice
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+    choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-{len(services)}): {RESET}", len(services))
+    if choice == 0:
+        return None, 0
+    return services[choice-1], choice
 
 
 def cloud_run_action_menu(project: str, service: Dict[str, Any]) -> int:
     """Display actions for a selected Cloud Run service."""
-    service_name = service.get("metadata", {}).get("name", "Unknown")
-    region = service.get("metadata", {}).get("labels", {}).get("cloud.googleapis.com/location", "Unknown")
+    service_name, region, _, _ = service_summary(service)
     
     while True:
         print_header()
-        print(f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}{Style.BRIGHT}Cloud Run Service: {service_name} ({region}){Style.RESET_ALL}")
+        sys.stdout.write("\n".join([
+            f"{Fore.YELLOW}{Style.BRIGHT}Project: {project}{Style.RESET_ALL}",
+            f"{Fore.GREEN}{Style.BRIGHT}Cloud Run Service: {service_name} ({region}){Style.RESET_ALL}",
+            f"{Fore.CYAN}Select an action:{Fore.RESET}",
+            "1) SSH into Cloud Run instance",
+            "2) View service details",
+            "3) View service logs",
+            "0) Back to service selection",
+            ""
+        ]))
+        sys.stdout.flush()
         
-        print(f"{Fore.CYAN}Select an action:{Fore.RESET}")
-        print(f"1) SSH into Cloud Run instance")
-        print(f"2) View service details")
-        print(f"3) View service logs")
-        print(f"0) Back to service selection")
+        choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-3): {RESET}", 3)
         
-        try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-3): {Fore.RESET}")
-            choice = int(choice)
-            
-            if choice == 0:
-                return 0
-            elif choice == 1:
-                ssh_to_cloud_run(project, service_name, region)
-            elif choice == 2:
-                view_cloud_run_details(project, service_name, region)
-            elif choice == 3:
-                view_cloud_run_logs(project, service_name, region)
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
-                input("Press Enter to continue...")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
-            input("Press Enter to continue...")
+        if choice == 0:
+            return 0
+        elif choice == 1:
+            ssh_to_cloud_run(project, service_name, region)
+        elif choice == 2:
+            view_cloud_run_details(project, service_name, region)
+        elif choice == 3:
+            view_cloud_run_logs(project, service_name, region)
 
 
 def ssh_to_cloud_run(project: str, service_name: str, region: str):
@@ -848,10 +1946,17 @@ def ssh_to_cloud_run(project: str, service_name: str, region: str):
     if debug_mode:
         print(f"{Fore.BLUE}Debug mode enabled. Additional logs will be displayed.{Fore.RESET}")
     
-    # First, check if the gcloud CLI version supports Cloud Run SSH
-    version_cmd = ["gcloud", "--version"]
-    code, stdout, stderr = run_command(version_cmd)
+    # The gcloud version, service details and revisions don't depend on each other,
+    # so fetch them at the same time
+    print(f"{Fore.YELLOW}Checking gcloud version and service {service_name} details...{Fore.RESET}")
+    version_result, (details, details_error), (revisions, revisions_error) = run_parallel([
+        get_gcloud_version,
+        lambda: describe_cloud_run_service(project, service_name, region),
+        lambda: list_cloud_run_revisions(project, service_name, region),
+    ])
     
+    # First, check if the gcloud CLI version supports Cloud Run SSH
+    code, stdout, stderr = version_result
     if code != 0:
         print(f"{Fore.RED}Failed to get gcloud version: {stderr}{Fore.RESET}")
         input("Press Enter to continue...")
@@ -861,73 +1966,47 @@ def ssh_to_cloud_run(project: str, service_name: str, region: str):
         print(f"{Fore.BLUE}[DEBUG] gcloud version info:{Fore.RESET}")
         print(stdout)
     
-    # Check service details first
-    print(f"{Fore.YELLOW}Checking service {service_name} details...{Fore.RESET}")
-    cmd = ["gcloud", "run", "services", "describe", service_name,
-           "--project", project, "--region", region,
-           "--format", "json"]
-    
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"{Fore.RED}Failed to get Cloud Run service details: {stderr}{Fore.RESET}")
+    # Check service details
+    if details is None:
+        print(f"{Fore.RED}Failed to get Cloud Run service details: {details_error}{Fore.RESET}")
         input("Press Enter to continue...")
         return
     
     if debug_mode:
         print(f"{Fore.BLUE}[DEBUG] Service details:{Fore.RESET}")
-        try:
-            details = json.loads(stdout)
-            details_str = json.dumps(details, indent=2)
-            print(details_str)
-        except:
-            print(stdout)
-    
-    # Get running instances/revisions
-    print(f"{Fore.YELLOW}Checking active revisions for {service_name}...{Fore.RESET}")
-    revisions_cmd = ["gcloud", "run", "revisions", "list",
-                     "--service", service_name,
-                     "--project", project, "--region", region,
-                     "--format", "json"]
-    
-    code, stdout, stderr = run_command(revisions_cmd)
+        json.dump(details, sys.stdout, indent=2, default=str)
+        print()
     
-    if code != 0:
-        print(f"{Fore.RED}Failed to get Cloud Run revisions: {stderr}{Fore.RESET}")
+    # Check running instances/revisions
+    if revisions is None:
+        print(f"{Fore.RED}Failed to get Cloud Run revisions: {revisions_error}{Fore.RESET}")
         input("Press Enter to continue...")
         return
     
     if debug_mode:
         print(f"{Fore.BLUE}[DEBUG] Revisions:{Fore.RESET}")
-        try:
-            revisions = json.loads(stdout)
-            revisions_str = json.dumps(revisions, indent=2)
-            print(revisions_str)
-        except:
-            print(stdout)
+        print(json.dumps(revisions, indent=2, default=str))
     
     # Show connection options
-    print(f"\n{Fore.CYAN}Select a connection method:{Fore.RESET}")
-    print(f"1) Try direct SSH (requires Cloud Run SSH enabled)")
-    print(f"2) Use exec method (interactive shell)")
-    print(f"3) Use debug container (advanced)")
-    
-    try:
-        connection_choice = input(f"\n{Fore.CYAN}Enter your choice (1-3): {Fore.RESET}")
-        connection_choice = int(connection_choice)
-        
-        if connection_choice == 1:
-            # Try direct SSH method
-            try_direct_ssh(project, service_name, region, debug_mode)
-        elif connection_choice == 2:
-            # Use exec method
-            use_exec_method(project, service_name, region, debug_mode)
-        elif connection_choice == 3:
-            # Use debug container
-            use_debug_container(project, service_name, region, debug_mode)
-        else:
-            print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
-    except ValueError:
-        print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+    sys.stdout.write("\n".join([
+        f"\n{Fore.CYAN}Select a connection method:{Fore.RESET}",
+        "1) Try direct SSH (requires Cloud Run SSH enabled)",
+        "2) Use exec method (interactive shell)",
+        "3) Use debug container (advanced)",
+        ""
+    ]))
+    sys.stdout.flush()
+    
+    connection_choice = _prompt_choice(f"\n{CYAN}Enter your choice (1-3): {RESET}", 3, min_n=1)
+    if connection_choice == 1:
+        # Try direct SSH method
+        try_direct_ssh(project, service_name, region, debug_mode)
+    elif connection_choice == 2:
+        # Use exec method
+        use_exec_method(project, service_name, region, debug_mode, revisions)
+    else:
+        # Use debug container
+        use_debug_container(project, service_name, region, debug_mode, details)
     
     input("\nPress Enter to continue...")
 
@@ -964,7 +2043,6 @@ def try_direct_ssh(project: str, service_name: str, region: str, debug_mode: boo
         print(f"{Fore.RED}Error connecting to Cloud Run instance: {str(e)}{Fore.RESET}")
         
         if debug_mode:
-            import traceback
             print(f"{Fore.RED}[DEBUG] Full exception traceback:{Fore.RESET}")
             traceback.print_exc()
     
@@ -978,29 +2056,28 @@ def try_direct_ssh(project: str, service_name: str, region: str, debug_mode: boo
         print(f"5. For more information, see: https://cloud.google.com/run/docs/debugging/ssh")
 
 
-def use_exec_method(project: str, service_name: str, region: str, debug_mode: bool):
-    """Use the exec method to get interactive shell access to a Cloud Run instance."""
+def use_exec_method(project: str, service_name: str, region: str, debug_mode: bool,
+                    revisions: Optional[List[Dict[str, Any]]] = None):
+    """Use the exec method to get interactive shell access to a Cloud Run instance.
+    
+    revisions can be passed in when the caller has already listed them.
+    """
     print(f"{Fore.YELLOW}Connecting to {service_name} using exec method...{Fore.RESET}")
     
     # First, get the latest revision
-    revisions_cmd = ["gcloud", "run", "revisions", "list",
-                     "--service", service_name,
-                     "--project", project, "--region", region,
-                     "--format", "json"]
-    
-    code, stdout, stderr = run_command(revisions_cmd)
-    if code != 0 or not stdout:
-        print(f"{Fore.RED}Failed to get revisions: {stderr}{Fore.RESET}")
-        return
+    if revisions is None:
+        revisions, error = list_cloud_run_revisions(project, service_name, region)
+        if revisions is None:
+            print(f"{Fore.RED}Failed to get revisions: {error}{Fore.RESET}")
+            return
     
     try:
-        revisions = json.loads(stdout)
         if not revisions:
             print(f"{Fore.RED}No revisions found for this service.{Fore.RESET}")
             return
         
         # Get the latest active revision
-        active_revisions = [r for r in revisions if r.get("status", {}).get("conditions", [{}])[0].get("status") == "True"]
+        active_revisions = _active_revisions(revisions)
         if not active_revisions:
             print(f"{Fore.RED}No active revisions found. The service might not be running.{Fore.RESET}")
             return
@@ -1049,29 +2126,131 @@ def use_exec_method(project: str, service_name: str, region: str, debug_mode: bo
         print(f"{Fore.RED}Error using exec method: {str(e)}{Fore.RESET}")
         
         if debug_mode:
-            import traceback
             print(f"{Fore.RED}[DEBUG] Full exception traceback:{Fore.RESET}")
             traceback.print_exc()
 
 
-def use_debug_container(project: str, service_name: str, region: str, debug_mode: bool):
-    """Connect to a Cloud Run instance via a debug container approach."""
+def _jwt_expiry(token: str) -> float:
+    """Read the exp claim of a JWT, or return 0 if the token can't be decoded."""
+    try:
+        payload = token.split(".")[1]
+        claims = json_loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return 0
+
+
+def _cached_identity_token(audience: str) -> Tuple[Optional[str], str]:
+    """Get an identity token for the audience, reusing a cached one until it is about to expire.
+    
+    Returns (token, error); token is None if gcloud failed.
+    """
+    cached = _identity_tokens.get(audience)
+    if cached is not None and time.time() < cached[1] - IDENTITY_TOKEN_MARGIN:
+        return cached[0], ""
+    
+    code, stdout, stderr = run_command(["gcloud", "auth", "print-identity-token",
+                                        "--audiences", audience])
+    if code != 0:
+        return None, stderr
+    
+    token = stdout.strip()
+    _identity_tokens[audience] = (token, _jwt_expiry(token))
+    return token, ""
+
+
+def _debug_session():
+    """Get the pooled HTTP session used for debug container requests, creating it on first use.
+    
+    Only usable with requests installed; callers check USE_REQUESTS and use curl otherwise.
+    """
+    global _debug_http_session
+    if not USE_REQUESTS:
+        raise RuntimeError("The requests package is required for the debug HTTP session")
+    if _debug_http_session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=10)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _debug_http_session = session
+    return _debug_http_session
+
+
+def debug_container_request(service_url: str, token: str, method: str, endpoint: str,
+                            command: Optional[str] = None, debug_mode: bool = False) -> str:
+    """Send a request to a debug container endpoint and return the response body.
+    
+    Uses the pooled HTTP session when requests is installed, otherwise curl.
+    """
+    url = f"{service_url}{endpoint}"
+    if USE_REQUESTS:
+        if debug_mode:
+            print(f"{Fore.BLUE}[DEBUG] {method} {url}{Fore.RESET}")
+        response = _debug_session().request(method, url, headers={"Authorization": f"Bearer {token}"},
+                                            json={"command": command} if command else None, timeout=30)
+        return response.text
+    
+    request_args = [url]
+    if method != "GET":
+        request_args = ["-H", "Content-Type: application/json",
+                        "-d", json.dumps({"command": command}), url]
+    curl_cmd = ["curl", "-s", "-H", f"Authorization: Bearer {token}", *request_args]
+    
+    if debug_mode:
+        # Don't print the full token in debug output
+        display_cmd = ["curl", "-s", "-H", "Authorization: Bearer [TOKEN]", *request_args]
+        print(f"{Fore.BLUE}[DEBUG] Running command: {' '.join(display_cmd)}{Fore.RESET}")
+    
+    result = subprocess.run(curl_cmd, capture_output=True, text=True)
+    if debug_mode and result.stderr:
+        print(f"{Fore.RED}[DEBUG] stderr: {result.stderr}{Fore.RESET}")
+    return result.stdout
+
+
+def run_batch(service_url: str, token: str, commands: List[str]) -> List[str]:
+    """Run several commands in the debug container with a single request to /_debug/batch.
+    
+    Returns the outputs in the order of the commands; raises if the request fails.
+    """
+    url = f"{service_url}/_debug/batch"
+    body = json.dumps({"commands": commands})
+    
+    if USE_REQUESTS:
+        response = _debug_session().post(url, data=body, timeout=60, headers={
+            "Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+        response.raise_for_status()
+        outputs = json_loads(response.content)
+    else:
+        code, stdout, stderr = run_command(["curl", "-s", "-f", "-H", f"Authorization: Bearer {token}",
+                                            "-H", "Content-Type: application/json",
+                                            "-d", body, url], binary=True)
+        if code != 0:
+            raise RuntimeError(stderr.strip() or f"curl exited with code {code}")
+        outputs = json_loads(stdout)
+    
+    if not isinstance(outputs, list) or len(outputs) != len(commands):
+        raise ValueError("unexpected response from /_debug/batch")
+    return [output if isinstance(output, str) else json.dumps(output, indent=2) for output in outputs]
+
+
+def use_debug_container(project: str, service_name: str, region: str, debug_mode: bool,
+                        details: Optional[Dict[str, Any]] = None):
+    """Connect to a Cloud Run instance via a debug container approach.
+    
+    details can be passed in when the caller has already described the service.
+    """
     print(f"{Fore.YELLOW}Connecting using debug container method...{Fore.RESET}")
     
     # Check if the service is accepting connections
     print(f"{Fore.BLUE}Checking service URL...{Fore.RESET}")
-    cmd = ["gcloud", "run", "services", "describe", service_name,
-           "--project", project, "--region", region,
-           "--format", "json(status.url)"]
-    
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"{Fore.RED}Failed to get service URL: {stderr}{Fore.RESET}")
-        return
+    if details is None:
+        details, error = describe_cloud_run_service(project, service_name, region)
+        if details is None:
+            print(f"{Fore.RED}Failed to get service URL: {error}{Fore.RESET}")
+            return
     
     try:
-        url_data = json.loads(stdout)
-        service_url = url_data.get("status", {}).get("url")
+        service_url = get_service_url(details)
         
         if not service_url:
             print(f"{Fore.RED}Could not get service URL.{Fore.RESET}")
@@ -1082,35 +2261,34 @@ def use_debug_container(project: str, service_name: str, region: str, debug_mode
         
         # Get an identity token for authentication
         print(f"{Fore.BLUE}Getting authentication token...{Fore.RESET}")
-        token_cmd = ["gcloud", "auth", "print-identity-token", 
-                     "--audiences", service_url]
-        
-        code, token, stderr = run_command(token_cmd)
-        if code != 0:
-            print(f"{Fore.RED}Failed to get authentication token: {stderr}{Fore.RESET}")
+        token, error = _cached_identity_token(service_url)
+        if token is None:
+            print(f"{Fore.RED}Failed to get authentication token: {error}{Fore.RESET}")
             return
         
-        token = token.strip()
-        
         if debug_mode:
             print(f"{Fore.BLUE}[DEBUG] Got token of length: {len(token)}{Fore.RESET}")
         
         # Offer options for accessing the container
-        print(f"\n{Fore.CYAN}Debug container options:{Fore.RESET}")
-        print(f"1) View environment variables")
-        print(f"2) View file system (ls -la)")
-        print(f"3) Show running processes (ps aux)")
-        print(f"4) Check network connections (netstat -tuln)")
-        print(f"5) Display memory usage (free -h)")
-        print(f"6) Check disk space (df -h)")
-        print(f"7) View system logs (tail /var/log/syslog)")
-        print(f"8) Run custom command")
-        print(f"9) Interactive mode (run multiple commands)")
-        print(f"0) Cancel")
+        sys.stdout.write("\n".join([
+            f"\n{Fore.CYAN}Debug container options:{Fore.RESET}",
+            "1) View environment variables",
+            "2) View file system (ls -la)",
+            "3) Show running processes (ps aux)",
+            "4) Check network connections (netstat -tuln)",
+            "5) Display memory usage (free -h)",
+            "6) Check disk space (df -h)",
+            "7) View system logs (tail /var/log/syslog)",
+            "8) Run custom command",
+            "9) Interactive mode (run multiple commands)",
+            "10) Run full diagnostic snapshot (one request)",
+            "0) Cancel",
+            ""
+        ]))
+        sys.stdout.flush()
         
         try:
-            debug_choice = input(f"\n{Fore.CYAN}Enter your choice (0-9): {Fore.RESET}")
-            debug_choice = int(debug_choice)
+            debug_choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-10): {RESET}", 10)
             
             if debug_choice == 0:
                 return
@@ -1158,85 +2336,75 @@ def use_debug_container(project: str, service_name: str, region: str, debug_mode
                         break
                     
                     # Execute the command
-                    curl_cmd = ["curl", "-s", "-H", f"Authorization: Bearer {token}", 
-                               "-H", "Content-Type: application/json",
-                               "-d", f'{{"command": "{cmd_input}"}}',
-                               f"{service_url}/_debug/cmd"]
-                    
-                    if debug_mode:
-                        masked_cmd = curl_cmd.copy()
-                        masked_cmd[3] = "Authorization: Bearer [TOKEN]"
-                        print(f"{Fore.BLUE}[DEBUG] Running: {' '.join(masked_cmd)}{Fore.RESET}")
-                    
-                    result = subprocess.run(curl_cmd, capture_output=True, text=True)
+                    try:
+                        output = debug_container_request(service_url, token, "POST", "/_debug/cmd",
+                                                         cmd_input, debug_mode)
+                    except Exception as e:
+                        print(f"{Fore.RED}Request failed: {str(e)}{Fore.RESET}")
+                        continue
                     
                     # Format and print the output
                     try:
-                        if result.stdout:
-                            output = result.stdout.strip()
+                        if output:
                             print()
-                            print(output)
+                            print(output.strip())
                             print()
                     except:
                         print(f"{Fore.RED}Error processing output{Fore.RESET}")
                 
                 return
-            
-            # Construct curl command to access debug endpoint
-            if method == "GET":
-                curl_cmd = ["curl", "-s", "-H", f"Authorization: Bearer {token}", 
-                           f"{service_url}{endpoint}"]
-            else:
-                curl_cmd = ["curl", "-s", "-H", f"Authorization: Bearer {token}", 
-                           "-H", "Content-Type: application/json",
-                           "-d", f'{{"command": "{command}"}}',
-                           f"{service_url}{endpoint}"]
-            
-            if debug_mode:
-                # Don't print the full token in debug output
-                masked_cmd = curl_cmd.copy()
-                if "-H" in masked_cmd:
-                    auth_index = masked_cmd.index("-H") + 1
-                    if auth_index < len(masked_cmd) and "Authorization: Bearer" in masked_cmd[auth_index]:
-                        masked_cmd[auth_index] = "Authorization: Bearer [TOKEN]"
-                print(f"{Fore.BLUE}[DEBUG] Running command: {' '.join(masked_cmd)}{Fore.RESET}")
+            elif debug_choice == 10:
+                # Send all diagnostics in one round trip instead of one request per command
+                print(f"{Fore.GREEN}Running diagnostic snapshot ({len(DIAGNOSTIC_COMMANDS)} commands)...{Fore.RESET}")
+                if debug_mode:
+                    print(f"{Fore.BLUE}[DEBUG] POST {service_url}/_debug/batch{Fore.RESET}")
+                try:
+                    outputs = run_batch(service_url, token, DIAGNOSTIC_COMMANDS)
+                except Exception as e:
+                    print(f"{Fore.RED}Diagnostic snapshot failed: {str(e)}{Fore.RESET}")
+                    print(f"{Fore.YELLOW}The container may not support /_debug/batch; try the individual options instead.{Fore.RESET}")
+                    return
+                
+                for command, output in zip(DIAGNOSTIC_COMMANDS, outputs):
+                    if USE_RICH:
+                        from rich.panel import Panel
+                        get_console().print(Panel(output.strip(), title=f"Output of {command}", width=120))
+                    else:
+                        print(f"\n{'-' * 20} {command} {'-' * 20}")
+                        print(output.strip())
+                return
             
             print(f"{Fore.GREEN}Executing command: {command if command else 'GET '+endpoint}{Fore.RESET}")
-            result = subprocess.run(curl_cmd, capture_output=True, text=True)
+            response_text = debug_container_request(service_url, token, method, endpoint, command, debug_mode)
             
             # Format and print the output
             try:
-                if result.stdout:
-                    output = result.stdout.strip()
+                if response_text:
+                    output = response_text.strip()
                     
                     # Try to pretty print JSON if it's a JSON response
                     try:
-                        json_data = json.loads(output)
+                        json_data = json_loads(output)
                         output = json.dumps(json_data, indent=2)
                     except:
                         pass
                     
                     if USE_RICH:
+                        from rich.panel import Panel
                         title = f"Output of {command if command else endpoint}"
                         panel = Panel(output, title=title, width=120)
-                        console.print(panel)
+                        get_console().print(panel)
                     else:
                         print("\n" + "-" * 50)
                         print(output)
                         print("-" * 50 + "\n")
-                
-                if debug_mode and result.stderr:
-                    print(f"{Fore.RED}[DEBUG] stderr: {result.stderr}{Fore.RESET}")
             except Exception as e:
                 print(f"{Fore.RED}Error formatting output: {str(e)}{Fore.RESET}")
             
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
         except Exception as e:
             print(f"{Fore.RED}Error in debug container method: {str(e)}{Fore.RESET}")
             
             if debug_mode:
-                import traceback
                 print(f"{Fore.RED}[DEBUG] Full exception traceback:{Fore.RESET}")
                 traceback.print_exc()
     
@@ -1244,7 +2412,6 @@ def use_debug_container(project: str, service_name: str, region: str, debug_mode
         print(f"{Fore.RED}Error using debug container: {str(e)}{Fore.RESET}")
         
         if debug_mode:
-            import traceback
             print(f"{Fore.RED}[DEBUG] Full exception traceback:{Fore.RESET}")
             traceback.print_exc()
 
@@ -1252,27 +2419,17 @@ def use_debug_container(project: str, service_name: str, region: str, debug_mode
 def view_cloud_run_details(project: str, service_name: str, region: str):
     """View detailed information about a Cloud Run service."""
     print(f"{Fore.YELLOW}Loading Cloud Run service details...{Fore.RESET}")
-    cmd = ["gcloud", "run", "services", "describe", service_name,
-           "--project", project, "--region", region,
-           "--format", "json"]
-    
-    code, stdout, stderr = run_command(cmd)
+    details, error = describe_cloud_run_service(project, service_name, region)
     
-    if code == 0:
-        try:
-            details = json.loads(stdout)
-            
-            if USE_RICH:
-                console.print(details, highlight=True)
-            else:
-                # Format JSON for readability
-                details_str = json.dumps(details, indent=2)
-                print(details_str)
-        except:
-            print(f"{Fore.RED}Failed to parse Cloud Run service details.{Fore.RESET}")
-            print(stdout)
+    if details is not None:
+        if USE_RICH:
+            get_console().print_json(data=details, default=str)
+        else:
+            # Write the JSON straight to stdout instead of building the whole string first
+            json.dump(details, sys.stdout, indent=2, default=str)
+            print()
     else:
-        print(f"{Fore.RED}Failed to get Cloud Run service details: {stderr}{Fore.RESET}")
+        print(f"{Fore.RED}Failed to get Cloud Run service details: {error}{Fore.RESET}")
     
     input("\nPress Enter to continue...")
 
@@ -1280,44 +2437,33 @@ def view_cloud_run_details(project: str, service_name: str, region: str):
 def view_cloud_run_logs(project: str, service_name: str, region: str):
     """View logs from a Cloud Run service."""
     print(f"{Fore.YELLOW}Loading Cloud Run service logs...{Fore.RESET}")
-    cmd = ["gcloud", "logging", "read", 
-           f"resource.type=cloud_run_revision AND resource.labels.service_name={service_name}",
-           f"--project={project}", "--limit=100", "--format=json"]
     
-    code, stdout, stderr = run_command(cmd)
+    if USE_RICH:
+        get_console().rule(f"Logs for {service_name}")
     
-    if code == 0:
-        try:
-            logs = json.loads(stdout)
-            formatted_logs = ""
-            
-            for entry in logs:
-                timestamp = entry.get("timestamp", "Unknown time")
-                message = entry.get("textPayload", entry.get("jsonPayload", {}).get("message", "No message"))
-                severity = entry.get("severity", "INFO")
-                
-                severity_color = {
-                    "ERROR": Fore.RED,
-                    "WARNING": Fore.YELLOW,
-                    "INFO": Fore.GREEN,
-                    "DEBUG": Fore.BLUE
-                }.get(severity, Fore.WHITE)
-                
-                formatted_logs += f"{timestamp} {severity_color}[{severity}]{Fore.RESET} {message}\n\n"
-            
-            if USE_RICH:
-                # Create a panel with scrollable content
-                panel = Panel(formatted_logs or "No logs found", 
-                              title=f"Logs for {service_name}", 
-                              width=120, height=30)
-                console.print(panel)
-            else:
-                print(formatted_logs or "No logs found")
-        except Exception as e:
-            print(f"{Fore.RED}Failed to parse Cloud Run logs: {str(e)}{Fore.RESET}")
-            print(stdout)
-    else:
-        print(f"{Fore.RED}Failed to get Cloud Run logs: {stderr}{Fore.RESET}")
+    shown = 0
+    
+    # Entries are printed as they arrive instead of after all of them are loaded
+    def show_entry(entry: Dict[str, Any]) -> None:
+        nonlocal shown
+        timestamp = entry.get("timestamp", "Unknown time")
+        message = entry.get("textPayload", entry.get("jsonPayload", {}).get("message", "No message"))
+        severity = entry.get("severity", "INFO")
+        
+        severity_color = _SEVERITY_COLORS.get(severity, Fore.WHITE)
+        
+        print(f"{timestamp} {severity_color}[{severity}]{Fore.RESET} {message}\n")
+        shown += 1
+    
+    error = stream_cloud_run_logs(project, service_name, show_entry)
+    
+    if error is not None:
+        print(f"{Fore.RED}Failed to get Cloud Run logs: {error}{Fore.RESET}")
+    elif not shown:
+        print("No logs found")
+    
+    if USE_RICH:
+        get_console().rule()
     
     input("\nPress Enter to continue...")
 
@@ -1357,7 +2503,7 @@ def manage_vms(config_file: str):
             if vm_choice == 0:
                 break
             
-            vm_result = vm_action_menu(project, vm)
+            vm_result = vm_action_menu(project, vm, config_file)
             if vm_result == 0:
                 continue
 
@@ -1366,98 +2512,82 @@ def manage_projects(config: Dict[str, Any], config_file: str) -> None:
     """Manage projects in the configuration."""
     while True:
         print_header()
-        print(f"{Fore.YELLOW}{Style.BRIGHT}Project Management{Style.RESET_ALL}")
-        print(f"1) List configured projects")
-        print(f"2) Add new project")
-        print(f"3) Remove project")
-        print(f"0) Back to main menu")
+        sys.stdout.write("\n".join([
+            f"{Fore.YELLOW}{Style.BRIGHT}Project Management{Style.RESET_ALL}",
+            "1) List configured projects",
+            "2) Add new project",
+            "3) Remove project",
+            "0) Back to main menu",
+            ""
+        ]))
+        sys.stdout.flush()
         
-        try:
-            choice = input(f"\n{Fore.CYAN}Enter your choice (0-3): {Fore.RESET}")
-            choice = int(choice)
-            
-            if choice == 0:
-                return
-            elif choice == 1:
-                projects = get_project_list(config_file)
-                if not projects:
-                    print(f"{Fore.YELLOW}No projects configured.{Fore.RESET}")
-                else:
-                    print(f"\n{Fore.GREEN}Configured projects:{Fore.RESET}")
-                    for project in projects:
-                        print(f"- {project}")
-                input("\nPress Enter to continue...")
-            elif choice == 2:
-                project_name = input(f"{Fore.CYAN}Enter project name: {Fore.RESET}")
-                if project_name:
-                    if project_name in config["projects"]:
-                        print(f"{Fore.RED}Project already exists.{Fore.RESET}")
-                    else:
-                        config["projects"][project_name] = {"vms": []}
-                        save_config(config, config_file)
-                        print(f"{Fore.GREEN}Project added successfully.{Fore.RESET}")
-                input("\nPress Enter to continue...")
-            elif choice == 3:
-                projects = get_project_list(config_file)
-                if not projects:
-                    print(f"{Fore.YELLOW}No projects to remove.{Fore.RESET}")
-                    input("\nPress Enter to continue...")
-                    continue
-                
-                print(f"\n{Fore.GREEN}Select project to remove:{Fore.RESET}")
-                for i, project in enumerate(projects, 1):
-                    print(f"{i}) {project}")
-                print(f"0) Cancel")
-                
-                try:
-                    remove_choice = input(f"\n{Fore.CYAN}Enter your choice (0-{len(projects)}): {Fore.RESET}")
-                    remove_choice = int(remove_choice)
-                    
-                    if 0 < remove_choice <= len(projects):
-                        project_to_remove = projects[remove_choice - 1]
-                        confirm = input(f"{Fore.YELLOW}Are you sure you want to remove {project_to_remove}? (y/N): {Fore.RESET}")
-                        if confirm.lower() == 'y':
-                            del config["projects"][project_to_remove]
-                            save_config(config, config_file)
-                            print(f"{Fore.GREEN}Project removed successfully.{Fore.RESET}")
-                except ValueError:
-                    print(f"{Fore.RED}Invalid choice.{Fore.RESET}")
-                input("\nPress Enter to continue...")
+        choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-3): {RESET}", 3)
+        
+        if choice == 0:
+            return
+        elif choice == 1:
+            projects = get_project_list(config_file)
+            if not projects:
+                print(f"{Fore.YELLOW}No projects configured.{Fore.RESET}")
             else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Fore.RESET}")
+                print(f"\n{Fore.GREEN}Configured projects:{Fore.RESET}")
+                for project in projects:
+                    print(f"- {project}")
+            input("\nPress Enter to continue...")
+        elif choice == 2:
+            project_name = input(f"{Fore.CYAN}Enter project name: {Fore.RESET}")
+            if project_name:
+                if project_name in config["projects"]:
+                    print(f"{Fore.RED}Project already exists.{Fore.RESET}")
+                else:
+                    config["projects"][project_name] = {"vms": []}
+                    save_config(config, config_file)
+                    print(f"{Fore.GREEN}Project added successfully.{Fore.RESET}")
+            input("\nPress Enter to continue...")
+        elif choice == 3:
+            projects = get_project_list(config_file)
+            if not projects:
+                print(f"{Fore.YELLOW}No projects to remove.{Fore.RESET}")
                 input("\nPress Enter to continue...")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a number.{Fore.RESET}")
+                continue
+            
+            print(f"\n{Fore.GREEN}Select project to remove:{Fore.RESET}")
+            for i, project in enumerate(projects, 1):
+                print(f"{i}) {project}")
+            print(f"0) Cancel")
+            
+            remove_choice = _prompt_choice(f"\n{CYAN}Enter your choice (0-{len(projects)}): {RESET}",
+                                           len(projects))
+            if remove_choice > 0:
+                project_to_remove = projects[remove_choice - 1]
+                confirm = input(f"{Fore.YELLOW}Are you sure you want to remove {project_to_remove}? (y/N): {Fore.RESET}")
+                if confirm.lower() == 'y':
+                    del config["projects"][project_to_remove]
+                    save_config(config, config_file)
+                    print(f"{Fore.GREEN}Project removed successfully.{Fore.RESET}")
             input("\nPress Enter to continue...")
 
 
-def configure_port_forwarding(project: str, vm_name: str, zone: str):
-    """Configure port forwarding for a VM."""
-    print(f"{Fore.CYAN}Configuring port forwarding for {vm_name}...{Fore.RESET}")
-    
-    # Get remote port
+def _prompt_port(label: str) -> int:
+    """Ask for a port number until a valid one (1-65535) is entered."""
     while True:
         try:
-            remote_port = input(f"{Fore.CYAN}Enter remote port (e.g., 8080): {Fore.RESET}")
-            remote_port = int(remote_port)
-            if 1 <= remote_port <= 65535:
-                break
-            else:
-                print(f"{Fore.RED}Port must be between 1 and 65535.{Fore.RESET}")
+            port = int(input(f"{Fore.CYAN}Enter {label} port (e.g., 8080): {Fore.RESET}"))
         except ValueError:
             print(f"{Fore.RED}Please enter a valid port number.{Fore.RESET}")
+            continue
+        if 1 <= port <= 65535:
+            return port
+        print(f"{Fore.RED}Port must be between 1 and 65535.{Fore.RESET}")
+
+
+def configure_port_forwarding(project: str, vm_name: str, zone: str):
+    """Configure port forwarding for a VM."""
+    print(f"{Fore.CYAN}Configuring port forwarding for {vm_name}...{Fore.RESET}")
     
-    # Get local port
-    while True:
-        try:
-            local_port = input(f"{Fore.CYAN}Enter local port (e.g., 8080): {Fore.RESET}")
-            local_port = int(local_port)
-            if 1 <= local_port <= 65535:
-                break
-            else:
-                print(f"{Fore.RED}Port must be between 1 and 65535.{Fore.RESET}")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a valid port number.{Fore.RESET}")
+    remote_port = _prompt_port("remote")
+    local_port = _prompt_port("local")
     
     # Construct the port forwarding command using start-iap-tunnel
     cmd = ["gcloud", "compute", "start-iap-tunnel", vm_name, str(remote_port),
@@ -1509,6 +2639,10 @@ def main():
         
         Fore = ForeStub()
         Style = StyleStub()
+        
+        global _header_template
+        _header_template = None
+        init_colors()
     
     # Load configuration using the path from args
     config = load_config(args.config)
@@ -1535,13 +2669,14 @@ def main():
                 manage_cloud_run(args.config)
             elif main_choice == 3:
                 manage_projects(config, args.config)
+            elif main_choice == 4:
+                display_vm_overview(args.config)
     except KeyboardInterrupt:
         print(f"\n{Fore.GREEN}Goodbye!{Fore.RESET}")
         sys.exit(0)
     except Exception as e:
         print(f"{Fore.RED}An unexpected error occurred: {str(e)}{Fore.RESET}")
         if args.debug:
-            import traceback
             traceback.print_exc()
         sys.exit(1)
 
@@ -31,8 +31,25 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "colorama>=0.4.4",
-        "rich>=10.0.0",
+        "rich>=12.0.0",
     ],
+    extras_require={
+        "sdk": [
+            "google-cloud-compute>=1.0.0",
+            "google-api-python-client>=2.0.0",
+            "google-cloud-logging>=3.0.0",
+            "google-cloud-run>=0.10.0",
+            "ijson>=3.0",
+            "orjson>=3.0",
+            "requests>=2.20.0",
+        ],
+        "test": [
+            "coverage>=7.4.0",
+            "pytest>=7.0.0",
+            "pytest-cov>=4.0.0",
+            "pytest-xdist>=3.0.0",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "gcp-vm-manager=gcp_vm_manager:main",
@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for the GCP VM Manager tests.
+"""
+
+import os
+import sys
+
+# Make gcp_vm_manager importable however pytest is started
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
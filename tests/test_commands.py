@@ -3,18 +3,50 @@
 Unit tests for the GCP VM Manager command execution functions.
 """
 
-import os
+import io
+import sys
+import json
+import time
+import base64
+import asyncio
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, call, MagicMock
 
 # Import the functions from the main script
-import sys
-sys.path.append(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
-from gcp_vm_manager import run_command, get_vm_status, get_all_vm_statuses
+import gcp_vm_manager
+from gcp_vm_manager import (
+    run_command, get_vm_status, get_all_vm_statuses,
+    get_vm_status_cached, invalidate_vm_status, get_all_vm_statuses_multi,
+    stream_command_json, compute_api_get, list_cloud_run_revisions, stream_cloud_run_logs
+)
 
 class TestCommandFunctions(unittest.TestCase):
     """Test case for command execution functions."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Use the gcloud code path for the whole class unless a test opts into a library."""
+        cls.patchers = [patch(f'gcp_vm_manager.{flag}', False)
+                        for flag in ('USE_COMPUTE_SDK', 'USE_REQUESTS', 'USE_RUN_SDK', 'USE_LOGGING_SDK')]
+        for patcher in cls.patchers:
+            patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Undo the class-wide patches."""
+        for patcher in reversed(cls.patchers):
+            patcher.stop()
+
+    def setUp(self):
+        """Start every test with empty caches."""
+        gcp_vm_manager._status_cache.clear()
+        gcp_vm_manager._status_listed_at.clear()
+        gcp_vm_manager.describe_cloud_run_service.cache_clear()
+        gcp_vm_manager.list_cloud_run_revisions.cache_clear()
+        gcp_vm_manager.get_gcloud_version.cache_clear()
+        gcp_vm_manager._identity_tokens.clear()
+
     @patch('subprocess.run')
     def test_run_command_success(self, mock_run):
         """Test running a command that succeeds."""
@@ -63,6 +95,29 @@ class TestCommandFunctions(unittest.TestCase):
         self.assertEqual(stdout, "")
         self.assertEqual(stderr, "error message")
 
+    @patch('subprocess.run')
+    def test_run_command_binary(self, mock_run):
+        """Test running a command whose output is returned as bytes."""
+        # Setup mock
+        process_mock = MagicMock()
+        process_mock.returncode = 0
+        process_mock.stdout = b'{"name": "svc"}'
+        process_mock.stderr = b"warning"
+        mock_run.return_value = process_mock
+
+        # Call function
+        code, stdout, stderr = run_command(["test", "command"], binary=True)
+
+        # Verify results
+        mock_run.assert_called_once_with(
+            ["test", "command"],
+            capture_output=True,
+            check=False
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout, b'{"name": "svc"}')
+        self.assertEqual(stderr, "warning")
+
     @patch('subprocess.run')
     def test_run_command_exception(self, mock_run):
         """Test running a command that raises an exception."""
@@ -87,14 +142,18 @@ class TestCommandFunctions(unittest.TestCase):
     def test_get_vm_status_running(self, mock_run_command):
         """Test getting the status of a running VM."""
         # Setup mock
-        mock_run_command.return_value = (0, '{"status": "RUNNING"}', "")
+        mock_run_command.return_value = (0, "RUNNING\n", "")
 
         # Call function
         status = get_vm_status("test-project", "test-vm", "test-zone")
 
         # Verify results
         self.assertEqual(status, "RUNNING")
-        mock_run_command.assert_called_once()
+        mock_run_command.assert_called_once_with([
+            "gcloud", "compute", "instances", "describe", "test-vm",
+            "--project", "test-project", "--zone", "test-zone",
+            "--format", "value(status)"
+        ])
 
     @patch('gcp_vm_manager.run_command')
     def test_get_vm_status_error(self, mock_run_command):
@@ -110,10 +169,10 @@ class TestCommandFunctions(unittest.TestCase):
         mock_run_command.assert_called_once()
 
     @patch('gcp_vm_manager.run_command')
-    def test_get_vm_status_invalid_json(self, mock_run_command):
-        """Test getting the status of a VM when the response is not valid JSON."""
+    def test_get_vm_status_empty_output(self, mock_run_command):
+        """Test getting the status of a VM when gcloud prints no status."""
         # Setup mock
-        mock_run_command.return_value = (0, "not json", "")
+        mock_run_command.return_value = (0, "\n", "")
 
         # Call function
         status = get_vm_status("test-project", "test-vm", "test-zone")
@@ -128,7 +187,7 @@ class TestCommandFunctions(unittest.TestCase):
         # Setup mock
         mock_run_command.return_value = (
             0,
-            '[{"name": "vm1", "status": "RUNNING"}, {"name": "vm2", "status": "TERMINATED"}]',
+            b'[{"name": "vm1", "status": "RUNNING"}, {"name": "vm2", "status": "TERMINATED"}]',
             ""
         )
 
@@ -137,13 +196,17 @@ class TestCommandFunctions(unittest.TestCase):
 
         # Verify results
         self.assertEqual(statuses, {"vm1": "RUNNING", "vm2": "TERMINATED"})
-        mock_run_command.assert_called_once()
+        mock_run_command.assert_called_once_with([
+            "gcloud", "compute", "instances", "list",
+            "--project", "test-project",
+            "--format", "json(name,status,zone)"
+        ], binary=True)
 
     @patch('gcp_vm_manager.run_command')
     def test_get_all_vm_statuses_error(self, mock_run_command):
         """Test getting VM statuses when the command fails."""
         # Setup mock
-        mock_run_command.return_value = (1, "", "error message")
+        mock_run_command.return_value = (1, b"", "error message")
 
         # Call function
         statuses = get_all_vm_statuses("test-project")
@@ -156,7 +219,7 @@ class TestCommandFunctions(unittest.TestCase):
     def test_get_all_vm_statuses_invalid_json(self, mock_run_command):
         """Test getting VM statuses when the response is not valid JSON."""
         # Setup mock
-        mock_run_command.return_value = (0, "not json", "")
+        mock_run_command.return_value = (0, b"not json", "")
 
         # Call function
         statuses = get_all_vm_statuses("test-project")
@@ -166,5 +229,812 @@ class TestCommandFunctions(unittest.TestCase):
         mock_run_command.assert_called_once()
 
 
+    @patch('gcp_vm_manager.get_all_vm_statuses', return_value={})
+    @patch('gcp_vm_manager.get_vm_status')
+    def test_get_vm_status_cached_reuses_fresh_value(self, mock_get_vm_status, mock_get_all_vm_statuses):
+        """Test that a fresh cached status is returned without calling gcloud."""
+        # Setup mock
+        mock_get_vm_status.return_value = "RUNNING"
+
+        # Call function twice
+        first = get_vm_status_cached("test-project", "test-vm", "test-zone")
+        second = get_vm_status_cached("test-project", "test-vm", "test-zone")
+
+        # Verify results
+        self.assertEqual(first, "RUNNING")
+        self.assertEqual(second, "RUNNING")
+        mock_get_vm_status.assert_called_once_with("test-project", "test-vm", "test-zone")
+
+    @patch('gcp_vm_manager.get_all_vm_statuses', return_value={})
+    @patch('gcp_vm_manager.get_vm_status')
+    def test_get_vm_status_cached_expired(self, mock_get_vm_status, mock_get_all_vm_statuses):
+        """Test that an expired cached status is fetched again."""
+        # Setup mock
+        mock_get_vm_status.side_effect = ["RUNNING", "TERMINATED"]
+
+        # Call function with a TTL that is always expired
+        get_vm_status_cached("test-project", "test-vm", "test-zone", ttl=0)
+        status = get_vm_status_cached("test-project", "test-vm", "test-zone", ttl=0)
+
+        # Verify results
+        self.assertEqual(status, "TERMINATED")
+        self.assertEqual(mock_get_vm_status.call_count, 2)
+
+    @patch('gcp_vm_manager.get_all_vm_statuses', return_value={})
+    @patch('gcp_vm_manager.get_vm_status')
+    def test_get_vm_status_cached_invalidate(self, mock_get_vm_status, mock_get_all_vm_statuses):
+        """Test that invalidating a VM forces a fresh lookup."""
+        # Setup mock
+        mock_get_vm_status.side_effect = ["RUNNING", "STOPPING"]
+
+        # Call function, invalidate, call again
+        get_vm_status_cached("test-project", "test-vm", "test-zone")
+        invalidate_vm_status("test-project", "test-vm", "test-zone")
+        status = get_vm_status_cached("test-project", "test-vm", "test-zone")
+
+        # Verify results
+        self.assertEqual(status, "STOPPING")
+        self.assertEqual(mock_get_vm_status.call_count, 2)
+
+    @patch('gcp_vm_manager.get_vm_status')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_all_vm_statuses_populates_cache(self, mock_run_command, mock_get_vm_status):
+        """Test that listing VMs seeds the status cache."""
+        # Setup mock
+        mock_run_command.return_value = (0, '[{"name": "vm1", "status": "RUNNING", "zone": "zones/test-zone"}]', "")
+
+        # Call function
+        get_all_vm_statuses("test-project")
+        status = get_vm_status_cached("test-project", "vm1", "test-zone")
+
+        # Verify results
+        self.assertEqual(status, "RUNNING")
+        mock_get_vm_status.assert_not_called()
+
+    @patch('gcp_vm_manager.get_vm_status')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_vm_status_cached_lists_project(self, mock_run_command, mock_get_vm_status):
+        """Test that a cache miss lists the whole project instead of describing the VM."""
+        # Setup mock
+        mock_run_command.return_value = (0, '[{"name": "vm1", "status": "RUNNING", "zone": "zones/test-zone"}, '
+                                            '{"name": "vm2", "status": "TERMINATED", '
+                                            '"zone": "zones/test-zone"}]', "")
+
+        # Call function for two VMs of the same project
+        first = get_vm_status_cached("test-project", "vm1", "test-zone")
+        second = get_vm_status_cached("test-project", "vm2", "test-zone")
+
+        # Verify results
+        self.assertEqual(first, "RUNNING")
+        self.assertEqual(second, "TERMINATED")
+        mock_run_command.assert_called_once()
+        mock_get_vm_status.assert_not_called()
+
+    @patch('gcp_vm_manager.get_vm_status')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_vm_status_cached_same_name_other_zone(self, mock_run_command, mock_get_vm_status):
+        """Test that VMs with the same name in different zones keep their own status."""
+        # Setup mock
+        mock_run_command.return_value = (0, '[{"name": "vm1", "status": "RUNNING", "zone": "zones/zone-a"}, '
+                                            '{"name": "vm1", "status": "TERMINATED", '
+                                            '"zone": "zones/zone-b"}]', "")
+
+        # Call function for both VMs
+        first = get_vm_status_cached("test-project", "vm1", "zone-a")
+        second = get_vm_status_cached("test-project", "vm1", "zone-b")
+
+        # Verify results
+        self.assertEqual(first, "RUNNING")
+        self.assertEqual(second, "TERMINATED")
+        mock_run_command.assert_called_once()
+        mock_get_vm_status.assert_not_called()
+
+    @patch('gcp_vm_manager.get_vm_status')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_vm_status_cached_recently_listed(self, mock_run_command, mock_get_vm_status):
+        """Test that an invalidated VM of a recently listed project is described directly."""
+        # Setup mock
+        mock_run_command.return_value = (0, '[{"name": "vm1", "status": "RUNNING", "zone": "zones/test-zone"}]', "")
+        mock_get_vm_status.return_value = "STOPPING"
+
+        # List the project, invalidate the VM, then look it up again
+        get_all_vm_statuses("test-project")
+        invalidate_vm_status("test-project", "vm1", "test-zone")
+        status = get_vm_status_cached("test-project", "vm1", "test-zone")
+
+        # Verify results
+        self.assertEqual(status, "STOPPING")
+        mock_run_command.assert_called_once()
+        mock_get_vm_status.assert_called_once_with("test-project", "vm1", "test-zone")
+
+
+    @patch('gcp_vm_manager.get_all_vm_statuses')
+    def test_get_all_vm_statuses_multi(self, mock_get_all_vm_statuses):
+        """Test getting VM statuses for several projects in parallel."""
+        # Setup mock
+        mock_get_all_vm_statuses.side_effect = lambda project: {f"{project}-vm": "RUNNING"}
+        on_result = MagicMock()
+
+        # Call function
+        results = get_all_vm_statuses_multi(["project1", "project2"], on_result=on_result)
+
+        # Verify results
+        self.assertEqual(results, {
+            "project1": {"project1-vm": "RUNNING"},
+            "project2": {"project2-vm": "RUNNING"}
+        })
+        self.assertEqual(mock_get_all_vm_statuses.call_count, 2)
+        self.assertEqual(on_result.call_count, 2)
+
+    @patch('gcp_vm_manager.get_all_vm_statuses')
+    def test_get_all_vm_statuses_multi_empty(self, mock_get_all_vm_statuses):
+        """Test getting VM statuses when no projects are given."""
+        # Call function
+        results = get_all_vm_statuses_multi([])
+
+        # Verify results
+        self.assertEqual(results, {})
+        mock_get_all_vm_statuses.assert_not_called()
+
+
+    @patch('gcp_vm_manager.get_instances_client')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_all_vm_statuses_compute_sdk(self, mock_run_command, mock_get_client):
+        """Test getting VM statuses through the Compute Engine SDK."""
+        # Setup mock
+        instance = MagicMock()
+        instance.name = "vm1"
+        instance.status = "RUNNING"
+        instance.zone = "https://www.googleapis.com/compute/v1/projects/p/zones/us-central1-a"
+        mock_get_client.return_value.aggregated_list.return_value = [
+            ("zones/us-central1-a", MagicMock(instances=[instance])),
+            ("zones/europe-west1-b", MagicMock(instances=[]))
+        ]
+
+        # Call function
+        with patch('gcp_vm_manager.USE_COMPUTE_SDK', True):
+            statuses = get_all_vm_statuses("test-project")
+
+        # Verify results
+        self.assertEqual(statuses, {"vm1": "RUNNING"})
+        mock_get_client.return_value.aggregated_list.assert_called_once_with(project="test-project")
+        mock_run_command.assert_not_called()
+
+    @patch('gcp_vm_manager.get_instances_client')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_all_vm_statuses_compute_sdk_fallback(self, mock_run_command, mock_get_client):
+        """Test falling back to gcloud when the Compute Engine SDK call fails."""
+        # Setup mock
+        mock_get_client.side_effect = Exception("no credentials")
+        mock_run_command.return_value = (0, '[{"name": "vm1", "status": "TERMINATED"}]', "")
+
+        # Call function
+        with patch('gcp_vm_manager.USE_COMPUTE_SDK', True):
+            statuses = get_all_vm_statuses("test-project")
+
+        # Verify results
+        self.assertEqual(statuses, {"vm1": "TERMINATED"})
+        mock_run_command.assert_called_once()
+
+
+    def test_stream_command_json_success(self):
+        """Test streaming the elements of a JSON array printed by a command."""
+        items = []
+
+        # Call function
+        code, stderr, parse_error = stream_command_json(
+            [sys.executable, "-c", 'print(\'[{"name": "vm1"}, {"name": "vm2"}]\')'],
+            items.append
+        )
+
+        # Verify results
+        self.assertEqual(code, 0)
+        self.assertIsNone(parse_error)
+        self.assertEqual(items, [{"name": "vm1"}, {"name": "vm2"}])
+
+    def test_stream_command_json_failure(self):
+        """Test streaming the output of a command that fails."""
+        items = []
+
+        # Call function
+        code, stderr, parse_error = stream_command_json(
+            [sys.executable, "-c", "import sys; sys.stderr.write('error message'); sys.exit(2)"],
+            items.append
+        )
+
+        # Verify results
+        self.assertEqual(code, 2)
+        self.assertEqual(stderr, "error message")
+        self.assertEqual(items, [])
+
+    def test_stream_command_json_large_stderr(self):
+        """Test that a command writing more than a pipe buffer to stderr doesn't block the parse."""
+        items = []
+
+        # Call function
+        code, stderr, parse_error = stream_command_json(
+            [sys.executable, "-c",
+             "import sys; sys.stderr.write('w' * 1000000); sys.stderr.flush(); print('[1, 2]')"],
+            items.append
+        )
+
+        # Verify results
+        self.assertEqual(code, 0)
+        self.assertIsNone(parse_error)
+        self.assertEqual(items, [1, 2])
+        self.assertEqual(len(stderr), 1000000)
+
+    def test_stream_command_json_invalid_json(self):
+        """Test streaming a command whose output is not valid JSON."""
+        # Call function
+        code, stderr, parse_error = stream_command_json(
+            [sys.executable, "-c", "print('not json')"],
+            MagicMock()
+        )
+
+        # Verify results
+        self.assertEqual(code, 0)
+        self.assertIsNotNone(parse_error)
+
+    @patch('subprocess.Popen')
+    def test_stream_command_json_exception(self, mock_popen):
+        """Test streaming a command that cannot be started."""
+        # Setup mock
+        mock_popen.side_effect = FileNotFoundError("gcloud not found")
+
+        # Call function
+        code, stderr, parse_error = stream_command_json(["gcloud"], MagicMock())
+
+        # Verify results
+        self.assertEqual(code, 1)
+        self.assertEqual(stderr, "gcloud not found")
+
+
+    @patch('gcp_vm_manager.compute_api_get')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_all_vm_statuses_rest(self, mock_run_command, mock_compute_api_get):
+        """Test getting VM statuses through the Compute Engine REST API."""
+        # Setup mock
+        mock_compute_api_get.side_effect = [
+            {"items": {"zones/zone-a": {"instances": [{"name": "vm1", "status": "RUNNING"}]}},
+             "nextPageToken": "next"},
+            {"items": {"zones/zone-b": {"instances": [{"name": "vm2", "status": "TERMINATED"}]},
+                       "zones/zone-c": {"warning": {}}}}
+        ]
+
+        # Call function
+        with patch('gcp_vm_manager.USE_REQUESTS', True):
+            statuses = get_all_vm_statuses("test-project")
+
+        # Verify results
+        self.assertEqual(statuses, {"vm1": "RUNNING", "vm2": "TERMINATED"})
+        self.assertEqual(mock_compute_api_get.call_count, 2)
+        self.assertEqual(mock_compute_api_get.call_args[0][1]["pageToken"], "next")
+        mock_run_command.assert_not_called()
+
+    @patch('gcp_vm_manager.compute_api_get')
+    @patch('gcp_vm_manager.run_command')
+    def test_get_vm_status_rest(self, mock_run_command, mock_compute_api_get):
+        """Test getting the status of a VM through the Compute Engine REST API."""
+        # Setup mock
+        mock_compute_api_get.return_value = {"status": "RUNNING"}
+
+        # Call function
+        with patch('gcp_vm_manager.USE_REQUESTS', True):
+            status = get_vm_status("test-project", "test-vm", "test-zone")
+
+        # Verify results
+        self.assertEqual(status, "RUNNING")
+        mock_compute_api_get.assert_called_once_with(
+            "projects/test-project/zones/test-zone/instances/test-vm", {"fields": "status"})
+        mock_run_command.assert_not_called()
+
+    @patch('gcp_vm_manager.run_command')
+    def test_compute_api_get_refreshes_token(self, mock_run_command):
+        """Test that the access token is fetched once and refreshed after a 401."""
+        # Setup mock
+        mock_run_command.side_effect = [(0, "token1\n", ""), (0, "token2\n", "")]
+        session = MagicMock()
+        session.headers = {}
+        expired = MagicMock(status_code=401)
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"status": "RUNNING"}
+        session.get.side_effect = [ok, expired, ok]
+
+        # Call function twice
+        with patch('gcp_vm_manager._compute_session', None), \
+                patch('gcp_vm_manager.requests', create=True) as mock_requests:
+            mock_requests.Session.return_value = session
+            compute_api_get("projects/p/zones/z/instances/vm")
+            data = compute_api_get("projects/p/zones/z/instances/vm")
+
+        # Verify results
+        self.assertEqual(data, {"status": "RUNNING"})
+        self.assertEqual(session.headers["Authorization"], "Bearer token2")
+        mock_requests.Session.assert_called_once()
+        self.assertEqual(mock_run_command.call_count, 2)
+
+
+    def test_run_command_async(self):
+        """Test running a command on the event loop."""
+        # Call function
+        code, stdout, stderr = asyncio.run(gcp_vm_manager._run_command_async(
+            [sys.executable, "-c", "import sys; print('out'); sys.stderr.write('err'); sys.exit(3)"]))
+
+        # Verify results
+        self.assertEqual(code, 3)
+        self.assertEqual(stdout.strip(), "out")
+        self.assertEqual(stderr, "err")
+
+    @patch('gcp_vm_manager.get_run_revisions_client')
+    @patch('gcp_vm_manager.run_command')
+    def test_list_cloud_run_revisions_sdk(self, mock_run_command, mock_get_client):
+        """Test listing Cloud Run revisions through the SDK, newest first."""
+        # Setup mocks
+        def revision(name, create_time, state):
+            condition = MagicMock(type_="Ready")
+            condition.state.name = state
+            mock_revision = MagicMock(create_time=create_time, conditions=[condition])
+            mock_revision.name = f"projects/p/locations/r/services/svc/revisions/{name}"
+            return mock_revision
+        old = revision("svc-001", 1, "CONDITION_FAILED")
+        new = revision("svc-002", 2, "CONDITION_SUCCEEDED")
+        mock_get_client.return_value.list_revisions.return_value = [old, new]
+
+        # Call function
+        with patch('gcp_vm_manager.USE_RUN_SDK', True):
+            revisions, error = list_cloud_run_revisions("p", "svc", "r")
+
+        # Verify results
+        self.assertEqual(error, "")
+        self.assertEqual([r["metadata"]["name"] for r in revisions], ["svc-002", "svc-001"])
+        self.assertEqual(revisions[0]["status"]["conditions"][0]["status"], "True")
+        self.assertEqual(revisions[1]["status"]["conditions"][0]["status"], "False")
+        mock_get_client.return_value.list_revisions.assert_called_once_with(
+            parent="projects/p/locations/r/services/svc")
+        mock_run_command.assert_not_called()
+
+    @patch('gcp_vm_manager.get_run_revisions_client')
+    @patch('gcp_vm_manager.run_command')
+    def test_list_cloud_run_revisions_sdk_fallback(self, mock_run_command, mock_get_client):
+        """Test that revisions are listed with gcloud when the SDK call fails."""
+        # Setup mocks
+        mock_get_client.return_value.list_revisions.side_effect = Exception("permission denied")
+        mock_run_command.return_value = (0, '[{"metadata": {"name": "svc-001"}}]', "")
+
+        # Call function
+        with patch('gcp_vm_manager.USE_RUN_SDK', True):
+            revisions, error = list_cloud_run_revisions("p", "svc", "r")
+
+        # Verify results
+        self.assertEqual(revisions, [{"metadata": {"name": "svc-001"}}])
+        mock_run_command.assert_called_once_with([
+            "gcloud", "run", "revisions", "list",
+            "--service", "svc",
+            "--project", "p", "--region", "r",
+            "--format", "json"
+        ], binary=True)
+
+    @patch('gcp_vm_manager.subprocess.run')
+    @patch('gcp_vm_manager.list_cloud_run_revisions')
+    @patch('builtins.input')
+    def test_use_exec_method_reuses_revisions(self, mock_input, mock_list_revisions, mock_subprocess_run):
+        """Test that revisions passed in by ssh_to_cloud_run are not listed again."""
+        # Setup mocks
+        mock_input.return_value = "n"
+        revisions = [{"metadata": {"name": "svc-001"},
+                      "status": {"conditions": [{"type": "Ready", "status": "True"}]}}]
+
+        # Call function
+        gcp_vm_manager.use_exec_method("p", "svc", "r", False, revisions)
+
+        # Verify results
+        mock_list_revisions.assert_not_called()
+        mock_subprocess_run.assert_not_called()
+        mock_input.assert_called_once()
+
+    def test_active_revisions(self):
+        """Test that revisions are filtered on the Ready condition wherever it is listed."""
+        revisions = [
+            {"metadata": {"name": "svc-003"},
+             "status": {"conditions": [{"type": "Active", "status": "True"},
+                                       {"type": "Ready", "status": "False"}]}},
+            {"metadata": {"name": "svc-002"},
+             "status": {"conditions": [{"type": "ContainerHealthy", "status": "True"},
+                                       {"type": "Ready", "status": "True"}]}},
+            {"metadata": {"name": "svc-001"}},
+        ]
+
+        # Call function
+        active = gcp_vm_manager._active_revisions(revisions)
+
+        # Verify results
+        self.assertEqual([r["metadata"]["name"] for r in active], ["svc-002"])
+
+    @patch('builtins.input')
+    @patch('gcp_vm_manager.describe_cloud_run_service')
+    def test_view_cloud_run_details_plain(self, mock_describe, mock_input):
+        """Test that service details are written to stdout as indented JSON without rich."""
+        # Setup mock
+        mock_describe.return_value = ({"metadata": {"name": "svc"}}, "")
+
+        # Call function
+        with patch('gcp_vm_manager.USE_RICH', False), \
+             patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            gcp_vm_manager.view_cloud_run_details("p", "svc", "r")
+
+        # Verify results
+        self.assertIn('{\n  "metadata": {\n    "name": "svc"\n  }\n}\n', mock_stdout.getvalue())
+
+    @patch('gcp_vm_manager.run_command')
+    def test_describe_cloud_run_service_cached(self, mock_run_command):
+        """Test that service details are reused, but failed lookups are retried."""
+        # Setup mock
+        mock_run_command.side_effect = [(1, "", "error message"),
+                                        (0, '{"metadata": {"name": "svc"}}', "")]
+
+        # Call function three times
+        failed = gcp_vm_manager.describe_cloud_run_service("p", "svc", "r")
+        first = gcp_vm_manager.describe_cloud_run_service("p", "svc", "r")
+        second = gcp_vm_manager.describe_cloud_run_service("p", "svc", "r")
+
+        # Verify results
+        self.assertEqual(failed, (None, "error message"))
+        self.assertEqual(first, ({"metadata": {"name": "svc"}}, ""))
+        self.assertIs(first, second)
+        self.assertEqual(mock_run_command.call_count, 2)
+
+    def test_run_parallel(self):
+        """Test that parallel calls run concurrently and keep their order."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def call(value):
+            # Both calls must be running at the same time to get past the barrier
+            barrier.wait()
+            return value
+
+        # Call function
+        results = gcp_vm_manager.run_parallel([lambda: call("first"), lambda: call("second")])
+
+        # Verify results
+        self.assertEqual(results, ["first", "second"])
+
+    @patch('gcp_vm_manager.run_command')
+    def test_run_batch_curl(self, mock_run_command):
+        """Test running several debug container commands in one request."""
+        # Setup mock
+        mock_run_command.return_value = (0, '["out1", {"key": "value"}]', "")
+
+        # Call function
+        outputs = gcp_vm_manager.run_batch("https://svc", "token", ["env", "df -h"])
+
+        # Verify results
+        self.assertEqual(outputs, ["out1", '{\n  "key": "value"\n}'])
+        mock_run_command.assert_called_once()
+        cmd = mock_run_command.call_args[0][0]
+        self.assertEqual(cmd[-1], "https://svc/_debug/batch")
+        self.assertEqual(cmd[-2], '{"commands": ["env", "df -h"]}')
+
+    @patch('gcp_vm_manager.run_command')
+    def test_run_batch_unexpected_response(self, mock_run_command):
+        """Test that a response that doesn't match the commands is rejected."""
+        # Setup mock
+        mock_run_command.return_value = (0, '["out1"]', "")
+
+        # Call function
+        with self.assertRaises(ValueError):
+            gcp_vm_manager.run_batch("https://svc", "token", ["env", "df -h"])
+
+    @patch('gcp_vm_manager._debug_session')
+    def test_debug_container_request_session(self, mock_debug_session):
+        """Test that debug container requests go through the pooled HTTP session."""
+        # Setup mock
+        mock_debug_session.return_value.request.return_value.text = "output"
+
+        # Call function
+        with patch('gcp_vm_manager.USE_REQUESTS', True):
+            output = gcp_vm_manager.debug_container_request("https://svc", "token", "POST",
+                                                            "/_debug/cmd", "ls -la")
+
+        # Verify results
+        self.assertEqual(output, "output")
+        mock_debug_session.return_value.request.assert_called_once_with(
+            "POST", "https://svc/_debug/cmd", headers={"Authorization": "Bearer token"},
+            json={"command": "ls -la"}, timeout=30)
+
+    @patch('subprocess.run')
+    def test_debug_container_request_curl(self, mock_run):
+        """Test that debug container requests fall back to curl without requests."""
+        # Setup mock
+        mock_run.return_value.stdout = "output"
+        mock_run.return_value.stderr = ""
+
+        # Call function
+        output = gcp_vm_manager.debug_container_request("https://svc", "token", "GET", "/_debug/env")
+
+        # Verify results
+        self.assertEqual(output, "output")
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd, ["curl", "-s", "-H", "Authorization: Bearer token", "https://svc/_debug/env"])
+
+    @patch('subprocess.run')
+    def test_debug_container_request_curl_quoted_command(self, mock_run):
+        """Test that a command with quotes is sent to curl as valid JSON."""
+        # Setup mock
+        mock_run.return_value.stdout = ""
+        mock_run.return_value.stderr = ""
+
+        # Call function
+        gcp_vm_manager.debug_container_request("https://svc", "token", "POST", "/_debug/cmd",
+                                               'echo "hi"')
+
+        # Verify results
+        cmd = mock_run.call_args[0][0]
+        body = cmd[cmd.index("-d") + 1]
+        self.assertEqual(json.loads(body), {"command": 'echo "hi"'})
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_debug_container_request_curl_redacts_token(self, mock_run, mock_print):
+        """Test that the token is not printed with the curl command in debug mode."""
+        # Setup mock
+        mock_run.return_value.stdout = ""
+        mock_run.return_value.stderr = ""
+
+        # Call function
+        gcp_vm_manager.debug_container_request("https://svc", "secret-token", "POST", "/_debug/cmd",
+                                               "env", debug_mode=True)
+
+        # Verify results
+        printed = " ".join(str(call[0][0]) for call in mock_print.call_args_list)
+        self.assertIn("Authorization: Bearer [TOKEN]", printed)
+        self.assertNotIn("secret-token", printed)
+        self.assertIn("Authorization: Bearer secret-token", mock_run.call_args[0][0])
+
+    def test_debug_session_reused(self):
+        """Test that the pooled debug HTTP session is only created once."""
+        with patch('gcp_vm_manager._debug_http_session', None), \
+                patch('gcp_vm_manager.USE_REQUESTS', True), \
+                patch('gcp_vm_manager.requests', create=True) as mock_requests:
+            self.assertIs(gcp_vm_manager._debug_session(), gcp_vm_manager._debug_session())
+        mock_requests.Session.assert_called_once()
+
+    def test_debug_session_without_requests(self):
+        """Test that the debug HTTP session fails clearly when requests is not installed."""
+        with patch('gcp_vm_manager._debug_http_session', None), \
+                patch('gcp_vm_manager.USE_REQUESTS', False):
+            with self.assertRaises(RuntimeError):
+                gcp_vm_manager._debug_session()
+
+    @staticmethod
+    def make_jwt(exp):
+        """Build an unsigned JWT with the given exp claim."""
+        payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=").decode()
+        return f"header.{payload}.signature"
+
+    @patch('gcp_vm_manager.run_command')
+    def test_identity_token_cached(self, mock_run_command):
+        """Test that an identity token is reused until it is about to expire."""
+        # Setup mock
+        token = self.make_jwt(time.time() + 3600)
+        mock_run_command.return_value = (0, token + "\n", "")
+
+        # Call function
+        first = gcp_vm_manager._cached_identity_token("https://svc")
+        second = gcp_vm_manager._cached_identity_token("https://svc")
+
+        # Verify results
+        self.assertEqual(first, (token, ""))
+        self.assertEqual(second, (token, ""))
+        mock_run_command.assert_called_once_with(
+            ["gcloud", "auth", "print-identity-token", "--audiences", "https://svc"])
+
+    @patch('gcp_vm_manager.run_command')
+    def test_identity_token_expiring(self, mock_run_command):
+        """Test that a token close to its expiry is fetched again."""
+        # Setup mock
+        mock_run_command.return_value = (0, self.make_jwt(time.time() + 30), "")
+
+        # Call function
+        gcp_vm_manager._cached_identity_token("https://svc")
+        gcp_vm_manager._cached_identity_token("https://svc")
+
+        # Verify results
+        self.assertEqual(mock_run_command.call_count, 2)
+
+    @patch('gcp_vm_manager.run_command')
+    def test_identity_token_error(self, mock_run_command):
+        """Test that a failed token request is reported and not cached."""
+        # Setup mock
+        mock_run_command.return_value = (1, "", "not logged in")
+
+        # Call function
+        result = gcp_vm_manager._cached_identity_token("https://svc")
+
+        # Verify results
+        self.assertEqual(result, (None, "not logged in"))
+        self.assertNotIn("https://svc", gcp_vm_manager._identity_tokens)
+
+    @patch('gcp_vm_manager._default_project', None)
+    @patch('gcp_vm_manager._credentials_error', None)
+    @patch('gcp_vm_manager._credentials', None)
+    def test_get_credentials_looked_up_once(self):
+        """Test that Application Default Credentials are only looked up once."""
+        # Setup mock
+        google = MagicMock()
+        google.auth.default.return_value = ("credentials", "default-project")
+
+        # Call function
+        with patch.dict(sys.modules, {"google": google, "google.auth": google.auth}):
+            first = gcp_vm_manager.get_credentials()
+            second = gcp_vm_manager.get_credentials()
+
+        # Verify results
+        self.assertEqual(first, "credentials")
+        self.assertEqual(second, "credentials")
+        self.assertEqual(gcp_vm_manager._default_project, "default-project")
+        google.auth.default.assert_called_once_with(
+            scopes=["https://www.googleapis.com/auth/cloud-platform"])
+
+    @patch('gcp_vm_manager._credentials_error', None)
+    @patch('gcp_vm_manager._credentials', None)
+    def test_get_credentials_failure_remembered(self):
+        """Test that a failed credentials lookup is not repeated."""
+        # Setup mock
+        google = MagicMock()
+        google.auth.default.side_effect = Exception("default credentials not found")
+
+        # Call function twice
+        with patch.dict(sys.modules, {"google": google, "google.auth": google.auth}):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError) as context:
+                    gcp_vm_manager.get_credentials()
+
+        # Verify results
+        self.assertIn("default credentials not found", str(context.exception))
+        google.auth.default.assert_called_once()
+
+    @patch('gcp_vm_manager._credentials_error', None)
+    @patch('gcp_vm_manager._credentials', None)
+    def test_get_credentials_looked_up_once_across_threads(self):
+        """Test that concurrent first calls share one Application Default Credentials lookup."""
+        # Setup mock
+        google = MagicMock()
+        def slow_default(scopes):
+            time.sleep(0.05)
+            return ("credentials", "default-project")
+        google.auth.default.side_effect = slow_default
+
+        # Call function
+        with patch.dict(sys.modules, {"google": google, "google.auth": google.auth}):
+            results = gcp_vm_manager.run_parallel([gcp_vm_manager.get_credentials] * 8)
+
+        # Verify results
+        self.assertEqual(results, ["credentials"] * 8)
+        google.auth.default.assert_called_once()
+
+    @patch('gcp_vm_manager.run_command')
+    def test_get_gcloud_version_runs_once(self, mock_run_command):
+        """Test that gcloud --version is only run once per process."""
+        # Setup mock
+        mock_run_command.return_value = (0, "Google Cloud SDK 450.0.0", "")
+
+        # Call function twice
+        gcp_vm_manager.get_gcloud_version()
+        version = gcp_vm_manager.get_gcloud_version()
+
+        # Verify results
+        self.assertEqual(version, (0, "Google Cloud SDK 450.0.0", ""))
+        mock_run_command.assert_called_once_with(["gcloud", "--version"])
+
+    def test_ttl_cache_expires(self):
+        """Test that ttl_cache calls the function again once a result expires."""
+        calls = []
+
+        @gcp_vm_manager.ttl_cache(0)
+        def lookup(key):
+            calls.append(key)
+            return key
+
+        # Call function twice with a TTL that is always expired
+        lookup("a")
+        lookup("a")
+
+        # Verify results
+        self.assertEqual(calls, ["a", "a"])
+
+    def test_stream_cloud_run_logs_error(self):
+        """Test reading Cloud Run logs when gcloud fails."""
+        # Setup mock
+        on_entry = MagicMock()
+
+        # Call function
+        with patch('gcp_vm_manager.stream_command_json', return_value=(1, "error message", None)):
+            error = stream_cloud_run_logs("p", "svc", on_entry)
+
+        # Verify results
+        self.assertEqual(error, "error message")
+        on_entry.assert_not_called()
+
+    @patch('gcp_vm_manager.get_logging_client')
+    def test_stream_cloud_run_logs_sdk(self, mock_get_client):
+        """Test that log entries from the SDK are passed on one by one."""
+        # Setup mocks
+        entry = MagicMock()
+        entry.to_api_repr.return_value = {"severity": "INFO", "textPayload": "started"}
+        mock_get_client.return_value.list_entries.return_value = iter([entry, entry])
+        on_entry = MagicMock()
+
+        # Call function
+        with patch('gcp_vm_manager.USE_LOGGING_SDK', True), \
+                patch('gcp_vm_manager.logging_v2', create=True), \
+                patch('gcp_vm_manager.stream_command_json') as mock_stream:
+            error = stream_cloud_run_logs("p", "svc", on_entry)
+
+        # Verify results
+        self.assertIsNone(error)
+        self.assertEqual(on_entry.call_count, 2)
+        on_entry.assert_called_with({"severity": "INFO", "textPayload": "started"})
+        mock_stream.assert_not_called()
+
+    @patch('builtins.print')
+    @patch('builtins.input')
+    def test_prompt_choice(self, mock_input, mock_print):
+        """Test that menu prompts retry until a valid choice is entered."""
+        # Setup mock
+        mock_input.side_effect = ["abc", "7", " 2 "]
+
+        # Call function
+        choice = gcp_vm_manager._prompt_choice("Choice: ", 3)
+
+        # Verify results
+        self.assertEqual(choice, 2)
+        self.assertEqual(mock_input.call_count, 3)
+        mock_print.assert_any_call(gcp_vm_manager._MSG_NUMBER)
+        mock_print.assert_any_call(gcp_vm_manager._MSG_INVALID)
+
+    @patch('builtins.print')
+    @patch('builtins.input')
+    def test_prompt_choice_rejects_superscript_and_negative(self, mock_input, mock_print):
+        """Test that digits int() can't parse and negative numbers don't end the prompt."""
+        # Setup mock
+        mock_input.side_effect = ["\u00b2", "-1", "1"]
+
+        # Call function
+        choice = gcp_vm_manager._prompt_choice("Choice: ", 3)
+
+        # Verify results
+        self.assertEqual(choice, 1)
+        self.assertEqual(mock_print.call_args_list,
+                         [call(gcp_vm_manager._MSG_NUMBER),
+                          call(gcp_vm_manager._MSG_INVALID)])
+
+    @patch('builtins.print')
+    @patch('builtins.input')
+    def test_prompt_choice_min_n(self, mock_input, mock_print):
+        """Test that choices below min_n are rejected."""
+        # Setup mock
+        mock_input.side_effect = ["0", "3"]
+
+        # Call function
+        choice = gcp_vm_manager._prompt_choice("Choice: ", 3, min_n=1)
+
+        # Verify results
+        self.assertEqual(choice, 3)
+        mock_print.assert_called_once_with(gcp_vm_manager._MSG_INVALID)
+
+    @patch('builtins.input')
+    def test_prompt_choice_extra_key(self, mock_input):
+        """Test that extra menu keys are returned lowercased."""
+        # Setup mock
+        mock_input.return_value = "R"
+
+        # Call function
+        choice = gcp_vm_manager._prompt_choice("Choice: ", 3, extra=("r",))
+
+        # Verify results
+        self.assertEqual(choice, "r")
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
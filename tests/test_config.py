@@ -5,49 +5,107 @@ Unit tests for the GCP VM Manager configuration functions.
 
 import os
 import json
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 
 # Import the functions from the main script
-import sys
-sys.path.append(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
-from gcp_vm_manager import load_config, save_config, get_project_list
+import gcp_vm_manager
+from gcp_vm_manager import load_config, save_config, get_project_list, flush_config
 
 class TestConfigFunctions(unittest.TestCase):
     """Test case for configuration functions."""
 
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open, read_data='{"projects": {"test-project": {"vms": []}}}')
-    def test_load_config_existing_file(self, mock_file, mock_exists):
+    def setUp(self):
+        """Use a temporary config file and start with an empty config cache."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.config_path = os.path.join(self.temp_dir.name, "config.json")
+        self.reset_config_cache()
+        self.addCleanup(self.reset_config_cache)
+
+    def reset_config_cache(self):
+        """Drop the in-memory config and any pending write."""
+        if gcp_vm_manager._cfg["timer"] is not None:
+            gcp_vm_manager._cfg["timer"].cancel()
+        gcp_vm_manager._cfg.update(path=None, data=None, pending=None, mtime=None, dirty=False,
+                                   timer=None)
+        gcp_vm_manager._project_list_cache = None
+
+    def write_config_file(self, config):
+        """Write a config file directly, bypassing the cache."""
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f)
+
+    def test_load_config_existing_file(self):
         """Test loading configuration from an existing file."""
-        mock_exists.return_value = True
-        config = load_config()
-        mock_exists.assert_called_once_with("config.json")
-        mock_file.assert_called_once_with("config.json", 'r')
+        self.write_config_file({"projects": {"test-project": {"vms": []}}})
+        config = load_config(self.config_path)
         self.assertEqual(config, {"projects": {"test-project": {"vms": []}}})
 
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open)
-    def test_load_config_new_file(self, mock_file, mock_exists):
+    def test_load_config_new_file(self):
         """Test loading configuration when the file doesn't exist."""
-        mock_exists.return_value = False
-        config = load_config()
-        mock_exists.assert_called_once_with("config.json")
-        mock_file.assert_called_once_with("config.json", 'w')
+        config = load_config(self.config_path)
         self.assertEqual(config, {"projects": {}})
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), {"projects": {}})
+
+    def test_load_config_invalid_file(self):
+        """Test loading configuration from a file that is not valid JSON."""
+        with open(self.config_path, 'w') as f:
+            f.write("not json")
+        config = load_config(self.config_path)
+        self.assertEqual(config, {"projects": {}})
+
+    def test_load_config_cached(self):
+        """Test that an unchanged config file is only read once."""
+        self.write_config_file({"projects": {}})
+        first = load_config(self.config_path)
+        with patch('builtins.open', new_callable=mock_open) as mock_file:
+            second = load_config(self.config_path)
+        mock_file.assert_not_called()
+        self.assertIs(first, second)
 
-    @patch('builtins.open', new_callable=mock_open)
-    def test_save_config(self, mock_file):
+    def test_load_config_reloads_changed_file(self):
+        """Test that the config is read again after the file changes on disk."""
+        self.write_config_file({"projects": {}})
+        load_config(self.config_path)
+        self.write_config_file({"projects": {"test-project": {}}})
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, (stat.st_atime, stat.st_mtime + 10))
+        config = load_config(self.config_path)
+        self.assertEqual(config, {"projects": {"test-project": {}}})
+
+    def test_save_config(self):
         """Test saving configuration to a file."""
+        self.write_config_file({"projects": {}})
         config = {"projects": {"test-project": {"vms": []}}}
-        save_config(config)
-        mock_file.assert_called_once_with("config.json", 'w')
-        # Check if write was called at least once (not strict on exactly once)
-        self.assertTrue(mock_file().write.called)
-        # Check if the written content is valid JSON by joining all write calls
-        write_args = [args[0] for args, _ in mock_file().write.call_args_list]
-        written_content = ''.join(write_args)
-        self.assertTrue(json.loads(written_content))
+        save_config(config, self.config_path)
+        # The write is deferred, but the cached copy is already updated
+        self.assertIs(load_config(self.config_path), config)
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), {"projects": {}})
+        flush_config()
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), config)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["config.json"])
+
+    def test_save_config_writes_snapshot(self):
+        """Test that changes made after save_config are not written by the deferred flush."""
+        config = {"projects": {"test-project": {}}}
+        save_config(config, self.config_path)
+        config["projects"]["unsaved"] = {}
+        flush_config()
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), {"projects": {"test-project": {}}})
+
+    def test_save_config_other_file_flushes_pending(self):
+        """Test that switching config files writes the pending changes first."""
+        other_path = os.path.join(self.temp_dir.name, "other.json")
+        save_config({"projects": {"first": {}}}, self.config_path)
+        save_config({"projects": {"second": {}}}, other_path)
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), {"projects": {"first": {}}})
 
     @patch('gcp_vm_manager.load_config')
     def test_get_project_list(self, mock_load_config):
@@ -65,6 +123,20 @@ class TestConfigFunctions(unittest.TestCase):
         mock_load_config.assert_called_once()
         self.assertEqual(projects, [])
 
+    @patch('gcp_vm_manager.load_config')
+    def test_get_project_list_cached(self, mock_load_config):
+        """Test that the project list is reused until the configuration is saved."""
+        mock_load_config.return_value = {"projects": {"test-project1": {}}}
+        first = get_project_list(self.config_path)
+        first.append("changed-by-caller")
+        second = get_project_list(self.config_path)
+        save_config({"projects": {"test-project2": {}}}, self.config_path)
+        mock_load_config.return_value = {"projects": {"test-project2": {}}}
+        third = get_project_list(self.config_path)
+        self.assertEqual(second, ["test-project1"])
+        self.assertEqual(third, ["test-project2"])
+        self.assertEqual(mock_load_config.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -5,11 +5,6 @@ Unit tests for GCP VM Manager
 
 import unittest
 from unittest.mock import patch, MagicMock
-import sys
-import os
-
-# Add the parent directory to the Python path so we can import gcp_vm_manager
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from gcp_vm_manager import configure_port_forwarding
 
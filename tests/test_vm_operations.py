@@ -3,218 +3,419 @@
 Unit tests for the GCP VM Manager VM operation functions.
 """
 
-import os
 import unittest
 from unittest.mock import patch, MagicMock, call
 
 # Import the functions from the main script
-import sys
-sys.path.append(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+import gcp_vm_manager
 from gcp_vm_manager import (
     start_vm, stop_vm, reset_vm, view_vm_details, 
-    view_vm_logs, run_command_on_vm
+    view_vm_logs, run_command_on_vm, bulk_vm_action, display_vms
 )
 
 class TestVMOperations(unittest.TestCase):
     """Test case for VM operation functions."""
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_start_vm_success(self, mock_input, mock_run_command):
+    @classmethod
+    def setUpClass(cls):
+        """Patch run_command and input once for the class and use the gcloud code path."""
+        cls.patchers = [patch('gcp_vm_manager.USE_COMPUTE_SDK', False),
+                        patch('gcp_vm_manager.run_command'),
+                        patch('builtins.input')]
+        _, cls.mock_run_command, cls.mock_input = [patcher.start() for patcher in cls.patchers]
+
+    @classmethod
+    def tearDownClass(cls):
+        """Undo the class-wide patches."""
+        for patcher in reversed(cls.patchers):
+            patcher.stop()
+
+    def setUp(self):
+        """Start every test with fresh mocks and an empty VM list cache."""
+        self.mock_run_command.reset_mock(return_value=True, side_effect=True)
+        self.mock_input.reset_mock(return_value=True, side_effect=True)
+        gcp_vm_manager._vm_list_cache.clear()
+
+    def test_start_vm_success(self):
         """Test starting a VM successfully."""
         # Setup mocks
-        mock_run_command.return_value = (0, "VM started", "")
+        self.mock_run_command.return_value = (0, "VM started", "")
         
         # Call function
         start_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "start", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_start_vm_failure(self, mock_input, mock_run_command):
+    def test_start_vm_failure(self):
         """Test starting a VM with an error."""
         # Setup mocks
-        mock_run_command.return_value = (1, "", "error message")
+        self.mock_run_command.return_value = (1, "", "error message")
         
         # Call function
         start_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "start", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
+
+    @patch('gcp_vm_manager.get_instances_client')
+    def test_start_vm_compute_sdk(self, mock_get_client):
+        """Test starting a VM through the Compute Engine SDK."""
+        # Call function
+        with patch('gcp_vm_manager.USE_COMPUTE_SDK', True):
+            start_vm("test-project", "test-vm", "test-zone")
+        
+        # Verify results
+        mock_get_client.return_value.start.assert_called_once_with(
+            project="test-project", zone="test-zone", instance="test-vm")
+        mock_get_client.return_value.start.return_value.result.assert_called_once()
+        self.mock_run_command.assert_not_called()
+        self.mock_input.assert_called_once()
+
+    @patch('gcp_vm_manager.get_instances_client')
+    def test_start_vm_compute_sdk_fallback(self, mock_get_client):
+        """Test starting a VM with gcloud when the Compute Engine SDK call fails."""
+        # Setup mocks
+        mock_get_client.return_value.start.side_effect = Exception("permission denied")
+        self.mock_run_command.return_value = (0, "VM started", "")
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_COMPUTE_SDK', True):
+            start_vm("test-project", "test-vm", "test-zone")
+        
+        # Verify results
+        self.mock_run_command.assert_called_once_with([
+            "gcloud", "compute", "instances", "start", "test-vm",
+            "--project", "test-project", "--zone", "test-zone"
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
+
+    @patch('gcp_vm_manager.get_instances_client')
+    def test_start_vm_compute_sdk_operation_fails(self, mock_get_client):
+        """Test that a failed Compute Engine SDK operation is reported without running gcloud."""
+        # Setup mocks
+        mock_get_client.return_value.start.return_value.result.side_effect = Exception("quota exceeded")
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_COMPUTE_SDK', True), patch('builtins.print') as mock_print:
+            start_vm("test-project", "test-vm", "test-zone")
+        
+        # Verify results
+        self.mock_run_command.assert_not_called()
+        printed = " ".join(str(call[0][0]) for call in mock_print.call_args_list)
+        self.assertIn("Failed to start VM: quota exceeded", printed)
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_stop_vm_success(self, mock_input, mock_run_command):
+    def test_stop_vm_success(self):
         """Test stopping a VM successfully."""
         # Setup mocks
-        mock_run_command.return_value = (0, "VM stopped", "")
+        self.mock_run_command.return_value = (0, "VM stopped", "")
         
         # Call function
         stop_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "stop", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_stop_vm_failure(self, mock_input, mock_run_command):
+    def test_stop_vm_failure(self):
         """Test stopping a VM with an error."""
         # Setup mocks
-        mock_run_command.return_value = (1, "", "error message")
+        self.mock_run_command.return_value = (1, "", "error message")
         
         # Call function
         stop_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "stop", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_reset_vm_success(self, mock_input, mock_run_command):
+    def test_reset_vm_success(self):
         """Test resetting a VM successfully."""
         # Setup mocks
-        mock_run_command.return_value = (0, "VM reset", "")
+        self.mock_run_command.return_value = (0, "VM reset", "")
         
         # Call function
         reset_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "reset", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_reset_vm_failure(self, mock_input, mock_run_command):
+    def test_reset_vm_failure(self):
         """Test resetting a VM with an error."""
         # Setup mocks
-        mock_run_command.return_value = (1, "", "error message")
+        self.mock_run_command.return_value = (1, "", "error message")
         
         # Call function
         reset_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "reset", "test-vm",
             "--project", "test-project", "--zone", "test-zone"
-        ])
-        mock_input.assert_called_once()
+        ], capture_output=False)
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    @patch('json.loads')
+    @patch('gcp_vm_manager.json_loads')
     @patch('builtins.print')
-    def test_view_vm_details_success(self, mock_print, mock_json_loads, mock_input, mock_run_command):
+    def test_view_vm_details_success(self, mock_print, mock_json_loads):
         """Test viewing VM details successfully."""
         # Setup mocks
-        mock_run_command.return_value = (0, '{"name": "test-vm"}', "")
+        self.mock_run_command.return_value = (0, '{"name": "test-vm"}', "")
         mock_json_loads.return_value = {"name": "test-vm"}
         
         # Call function
-        view_vm_details("test-project", "test-vm", "test-zone")
+        with patch('gcp_vm_manager.USE_RICH', True), patch('gcp_vm_manager.get_console'):
+            view_vm_details("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "describe", "test-vm",
             "--project", "test-project", "--zone", "test-zone",
             "--format", "json"
         ])
         mock_json_loads.assert_called_once_with('{"name": "test-vm"}')
-        mock_input.assert_called_once()
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
+    @patch('gcp_vm_manager.json_loads')
     @patch('builtins.print')
-    def test_view_vm_details_failure(self, mock_print, mock_input, mock_run_command):
+    def test_view_vm_details_plain(self, mock_print, mock_json_loads):
+        """Test that without rich the gcloud JSON is printed without being re-parsed."""
+        # Setup mocks
+        self.mock_run_command.return_value = (0, '{\n  "name": "test-vm"\n}', "")
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_RICH', False):
+            view_vm_details("test-project", "test-vm", "test-zone")
+        
+        # Verify results
+        mock_json_loads.assert_not_called()
+        mock_print.assert_any_call('{\n  "name": "test-vm"\n}')
+
+    @patch('builtins.print')
+    def test_view_vm_details_failure(self, mock_print):
         """Test viewing VM details with an error."""
         # Setup mocks
-        mock_run_command.return_value = (1, "", "error message")
+        self.mock_run_command.return_value = (1, "", "error message")
         
         # Call function
         view_vm_details("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "instances", "describe", "test-vm",
             "--project", "test-project", "--zone", "test-zone",
             "--format", "json"
         ])
-        mock_input.assert_called_once()
+        self.mock_input.assert_called_once()
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_run_command_on_vm_success(self, mock_input, mock_run_command):
+    def test_run_command_on_vm_success(self):
         """Test running a command on a VM successfully."""
         # Setup mocks
-        mock_input.side_effect = ["test command", None]  # First for command input, second for "Press Enter"
-        mock_run_command.return_value = (0, "command output", "")
+        self.mock_input.side_effect = ["test command", None]  # First for command input, second for "Press Enter"
+        self.mock_run_command.return_value = (0, "command output", "")
         
         # Call function
         run_command_on_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "ssh", "test-vm",
             "--project", "test-project", "--zone", "test-zone",
             "--tunnel-through-iap",
             "--command", "test command"
         ])
-        self.assertEqual(mock_input.call_count, 2)
+        self.assertEqual(self.mock_input.call_count, 2)
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_run_command_on_vm_failure(self, mock_input, mock_run_command):
+    def test_run_command_on_vm_failure(self):
         """Test running a command on a VM with an error."""
         # Setup mocks
-        mock_input.side_effect = ["test command", None]  # First for command input, second for "Press Enter"
-        mock_run_command.return_value = (1, "", "error message")
+        self.mock_input.side_effect = ["test command", None]  # First for command input, second for "Press Enter"
+        self.mock_run_command.return_value = (1, "", "error message")
         
         # Call function
         run_command_on_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_called_once_with([
+        self.mock_run_command.assert_called_once_with([
             "gcloud", "compute", "ssh", "test-vm",
             "--project", "test-project", "--zone", "test-zone",
             "--tunnel-through-iap",
             "--command", "test command"
         ])
-        self.assertEqual(mock_input.call_count, 2)
+        self.assertEqual(self.mock_input.call_count, 2)
 
-    @patch('gcp_vm_manager.run_command')
-    @patch('builtins.input')
-    def test_run_command_on_vm_empty_command(self, mock_input, mock_run_command):
+    def test_run_command_on_vm_empty_command(self):
         """Test running an empty command on a VM."""
         # Setup mocks
-        mock_input.side_effect = ["", None]  # First for command input, second for "Press Enter"
+        self.mock_input.side_effect = ["", None]  # First for command input, second for "Press Enter"
         
         # Call function
         run_command_on_vm("test-project", "test-vm", "test-zone")
         
         # Verify results
-        mock_run_command.assert_not_called()
-        self.assertEqual(mock_input.call_count, 2)
+        self.mock_run_command.assert_not_called()
+        self.assertEqual(self.mock_input.call_count, 2)
+
+
+    @patch('gcp_vm_manager.get_compute_service')
+    @patch('gcp_vm_manager._run_command_async')
+    def test_bulk_vm_action_batch_api(self, mock_run_command_async, mock_get_service):
+        """Test stopping several VMs with a batch request and waiting for the operations."""
+        # Setup mocks
+        service = mock_get_service.return_value
+        batch = service.new_batch_http_request.return_value
+        responses = [
+            # The stop calls, then one round of waiting for the accepted operation
+            [("zone-a/vm1", {"name": "operation-1"}, None),
+             ("zone-b/vm2", None, Exception("quota exceeded"))],
+            [("zone-a/vm1", {"status": "DONE"}, None)],
+        ]
+        
+        def execute():
+            callback = service.new_batch_http_request.call_args.kwargs["callback"]
+            for args in responses.pop(0):
+                callback(*args)
+        batch.execute.side_effect = execute
+        vms = [{"name": "vm1", "zone": "zone-a"}, {"name": "vm2", "zone": "zone-b"}]
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_BATCH_API', True):
+            results = bulk_vm_action("test-project", vms, "stop")
+        
+        # Verify results
+        self.assertEqual(results, {("vm1", "zone-a"): None, ("vm2", "zone-b"): "quota exceeded"})
+        service.instances.return_value.stop.assert_any_call(
+            project="test-project", zone="zone-a", instance="vm1")
+        service.zoneOperations.return_value.wait.assert_called_once_with(
+            project="test-project", zone="zone-a", operation="operation-1")
+        self.assertEqual(batch.execute.call_count, 2)
+        mock_run_command_async.assert_not_called()
+
+    @patch('gcp_vm_manager.get_compute_service')
+    @patch('gcp_vm_manager._run_command_async')
+    def test_bulk_vm_action_batch_operation_error(self, mock_run_command_async, mock_get_service):
+        """Test that an operation finishing with an error is reported for its VM."""
+        # Setup mocks
+        service = mock_get_service.return_value
+        batch = service.new_batch_http_request.return_value
+        responses = [
+            [("zone-a/vm1", {"name": "operation-1"}, None)],
+            [("zone-a/vm1", {"status": "DONE", "error": {"errors": [{"message": "disk busy"}]}}, None)],
+        ]
+        
+        def execute():
+            callback = service.new_batch_http_request.call_args.kwargs["callback"]
+            for args in responses.pop(0):
+                callback(*args)
+        batch.execute.side_effect = execute
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_BATCH_API', True):
+            results = bulk_vm_action("test-project", [{"name": "vm1", "zone": "zone-a"}], "reset")
+        
+        # Verify results
+        self.assertEqual(results, {("vm1", "zone-a"): "disk busy"})
+        mock_run_command_async.assert_not_called()
+
+    @patch('gcp_vm_manager.get_compute_service')
+    @patch('gcp_vm_manager._run_command_async')
+    def test_bulk_vm_action_batch_execute_fails(self, mock_run_command_async, mock_get_service):
+        """Test that a batch that may have reached the server is not sent again with gcloud."""
+        # Setup mocks
+        service = mock_get_service.return_value
+        service.new_batch_http_request.return_value.execute.side_effect = Exception("read timeout")
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_BATCH_API', True):
+            results = bulk_vm_action("test-project", [{"name": "vm1", "zone": "zone-a"}], "reset")
+        
+        # Verify results
+        self.assertIn("read timeout", results[("vm1", "zone-a")])
+        mock_run_command_async.assert_not_called()
+
+    @patch('gcp_vm_manager._run_command_async')
+    def test_bulk_vm_action_without_batch_api(self, mock_run_command_async):
+        """Test bulk actions fall back to concurrent gcloud operations."""
+        # Setup mocks
+        async def run_command_async(command):
+            if command[:3] == ["gcloud", "compute", "operations"]:
+                return 0, "", ""
+            if command[4] == "vm2":
+                return 1, "", "error message"
+            return 0, "operation-1\n", ""
+        mock_run_command_async.side_effect = run_command_async
+        vms = [{"name": "vm1", "zone": "zone-a"}, {"name": "vm2", "zone": "zone-b"}]
+        
+        # Call function
+        with patch('gcp_vm_manager.USE_BATCH_API', False):
+            results = bulk_vm_action("test-project", vms, "start")
+        
+        # Verify results
+        self.assertEqual(results, {("vm1", "zone-a"): None, ("vm2", "zone-b"): "error message"})
+        mock_run_command_async.assert_any_call([
+            "gcloud", "compute", "instances", "start", "vm1",
+            "--project", "test-project", "--zone", "zone-a",
+            "--async", "--format", "value(name)"
+        ])
+        mock_run_command_async.assert_any_call([
+            "gcloud", "compute", "operations", "wait", "operation-1",
+            "--project", "test-project", "--zone", "zone-a"
+        ])
+        self.assertEqual(mock_run_command_async.call_count, 3)
 
+    @patch('gcp_vm_manager._fetch_vms')
+    @patch('gcp_vm_manager.print_header')
+    def test_display_vms_reuses_cached_list(self, mock_print_header, mock_fetch_vms):
+        """Test that returning to the VM table doesn't list the project again."""
+        # Setup mocks
+        vm = {"name": "test-vm", "zone": "test-zone", "region": "US Central",
+              "status": "RUNNING", "description": "test"}
+        mock_fetch_vms.return_value = [vm]
+        self.mock_input.return_value = "1"
+        
+        # Call function
+        first = display_vms("test-project")
+        second = display_vms("test-project")
+        
+        # Verify results
+        self.assertEqual(first, (vm, 1))
+        self.assertEqual(second, (vm, 1))
+        mock_fetch_vms.assert_called_once_with("test-project", None)
+
+    @patch('gcp_vm_manager._fetch_vms')
+    @patch('gcp_vm_manager.print_header')
+    def test_display_vms_refresh(self, mock_print_header, mock_fetch_vms):
+        """Test that 'r' and VM actions force the VM list to be fetched again."""
+        # Setup mocks
+        mock_fetch_vms.return_value = [{"name": "test-vm", "zone": "test-zone", "status": "RUNNING"}]
+        self.mock_run_command.return_value = (0, "", "")
+        self.mock_input.side_effect = ["r", "0", "", "0"]
+        
+        # Call function
+        self.assertEqual(display_vms("test-project"), (None, 0))
+        stop_vm("test-project", "test-vm", "test-zone")
+        self.assertEqual(display_vms("test-project"), (None, 0))
+        
+        # Verify results
+        self.assertEqual(mock_fetch_vms.call_count, 3)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file